@@ -29,4 +29,19 @@ Table posts {
   topic_hash int [pk]
   feed_hash int [pk]
   url_hash int [pk]
-}
\ No newline at end of file
+}
+-- v3 (hashes with posted hour)
+Table posts {
+  topic_hash int [pk]
+  feed_hash int [pk]
+  url_hash int [pk]
+  hour int [not null]
+}
+
+-- v4 (hashes with posted hour, WITHOUT ROWID)
+Table posts {
+  topic_hash int [pk]
+  feed_hash int [pk]
+  url_hash int [pk]
+  hour int [not null]
+}
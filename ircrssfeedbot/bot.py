@@ -160,6 +160,13 @@ class Bot:
                 publisher.drain()
                 alerter(f"Drained {publisher}.", log.info)
 
+        # Flush database
+        log.info("Flushing database writes.")
+        if self._db.flush(timeout=config.DB_FLUSH_TIMEOUT):
+            log.info(f"Flushed database writes. The database writer has made {self._db.commit_stats}.")
+        else:
+            log.warning(f"Timed out after {config.DB_FLUSH_TIMEOUT}s flushing database writes, possibly due to database maintenance. Unflushed writes are lost.")
+
         # Exit
         log.info(f"Gracefully exiting with code {code}.")
         self._irc.disconnect(auto_reconnect=False)
@@ -29,13 +29,35 @@ GiB = 1024**3  # pylint: disable=invalid-name
 # Main
 ALERTS_CHANNEL_FORMAT_DEFAULT: Final = "##{nick}-alerts"
 CACHE_MAXSIZE__INT8HASH: Final = CACHE_MAXSIZE_DEFAULT
+CACHE_MAXSIZE__PIPELINE_MEMO: Final = CACHE_MAXSIZE_DEFAULT * 4  # Per pipeline per feed.
+CACHE_MAXSIZE__SHARED_PARSE: Final = 32
 CACHE_MAXSIZE__URL_COMPRESSION: Final = 4
 CACHE_MAXSIZE__URL_GOOGLE_NEWS: Final = CACHE_MAXSIZE_DEFAULT
 CACHE_MAXSIZE__URL_NETLOC: Final = CACHE_MAXSIZE_DEFAULT
 CACHE_MAXSIZE__URL_REDIRECT: Final = CACHE_MAXSIZE_DEFAULT
 CACHE_MAXSIZE__URL_SHORTENER: Final = CACHE_MAXSIZE_DEFAULT
+CACHE_TTL__PIPELINE_MEMO: Final = 24 * 3600
+CACHE_TTL__SHARED_PARSE: Final = 15 * 60
 CACHE_TTL__URL_COMPRESSION: Final = 60
-DB_FILENAME: Final = "posts.v2.db"
+DB_ANALYSIS_LIMIT: Final = 1_000  # Approximate number of rows examined per index by ANALYZE. Ref: https://www.sqlite.org/lang_analyze.html#approx
+DB_BULK_CHUNK_SIZE: Final = 100_000  # Rows per chunk of an exported file, and per transaction of an import or merge.
+DB_BULK_LOG_ROWS: Final = 1_000_000  # The progress of an export, import, or merge is logged after each of these many rows.
+DB_FILENAME: Final = "posts.v4.db"  # If this does not exist, the newest previous version, if any, is migrated to it.
+DB_FLUSH_TIMEOUT: Final = 60  # Seconds to wait for pending insertions to be committed before exiting, as maintenance can be underway.
+DB_GROUP_COMMIT_INSERTIONS_MAX: Final = 1_000
+DB_MAINTENANCE_DELAY: Final = 15 * 60  # Seconds after startup before the first maintenance.
+DB_MAINTENANCE_PERIOD: Final = 24 * 3600
+DB_MAINTENANCE_QUIET_SECONDS: Final = 60  # Maintenance is done only after no insertions have been queued for this duration.
+DB_POSTED_HASHES_PENDING_MAX: Final = 10_000
+DB_PRAGMAS: Final = {  # Ref: https://www.sqlite.org/pragma.html
+    "auto_vacuum": "incremental",  # For an existing database, this takes effect after a full vacuum, which is done by the maintenance.
+    "cache_size": -64 * 1024,  # Negative means KiB.
+    "journal_mode": "wal",
+    "mmap_size": 256 * 1024**2,
+    "synchronous": "normal",  # In WAL mode, this is safe from corruption, but the most recent commits can be lost upon power loss.
+}
+DB_PRUNE_BATCH_SIZE: Final = 10_000  # Rows deleted per transaction.
+DB_VACUUM_FREELIST_RATIO_MIN: Final = 0.25  # A full vacuum is done if at least this fraction of pages is free. Otherwise an incremental vacuum is done.
 DISKCACHE_PATH: Final = PACKAGE_PATH.parent / f".{PACKAGE_NAME}_cache"
 DISKCACHE_SIZE_LIMIT: Final = GiB * 2
 DEDUP_STRATEGY_DEFAULT: Final = "feed"
@@ -63,8 +85,10 @@ ETAG_CACHE_PROHIBITED_NETLOCS: Final = {
     "siliconangle.com",
 }
 ETAG_TEST_PROBABILITY: Final = 0.1
-FEED_DEFAULTS: Final = {"new": "some", "shorten": True}
+FEED_DEFAULTS: Final = {"new": "some", "retention": None, "shorten": True}
 IRC_COLORS: Final = set(ircstyle.colors.idToName.values())
+INCREMENTAL_CONSECUTIVE_POSTED_DEFAULT: Final = 10
+INCREMENTAL_POSTED_HASHES_MAX: Final = 10_000
 MIN_CHANNEL_IDLE_TIME_DEFAULT: Final = {"dev": 1}.get(ENV, 15 * 60)
 MIN_CONSECUTIVE_FEED_FAILURES_FOR_ALERT: Final = 3
 MIN_FEED_INTERVAL_FOR_REPEATED_ALERT: Final = 15 * 60
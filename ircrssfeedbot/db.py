@@ -1,7 +1,21 @@
 """Database interface."""
+import array
+import atexit
+import bisect
+import contextlib
+import dataclasses
+import json
 import logging
+import math
+import queue
+import sqlite3
+import tempfile
 import threading
-from typing import List, Set
+import time
+import unittest
+import unittest.mock
+from pathlib import Path
+from typing import Any, Dict, Final, Iterable, List, Optional, Set, Tuple, Union
 
 import peewee
 from peewee import chunked
@@ -9,9 +23,40 @@ from peewee import chunked
 from . import config
 from .util.hashlib import Int8Hash
 from .util.humanize import humanize_bytes
+from .util.timeit import Timer
 
 log = logging.getLogger(__name__)
-_DATABASE = peewee.SqliteDatabase(None)
+
+
+class _SqliteDatabase(peewee.SqliteDatabase):  # pylint: disable=abstract-method
+    """SQLite database which logs the connections which it opens.
+
+    Each thread opens its own connection on its first use of the database, and keeps it open.
+    In WAL mode, the readers thereby read concurrently with each other and with the writer.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.connection_thread_names: List[str] = []  # Note: This is appended to while holding the lock of the database.
+
+    def _initialize_connection(self, conn: sqlite3.Connection) -> None:
+        super()._initialize_connection(conn)
+        self.connection_thread_names.append(thread_name := threading.current_thread().name)
+        log.info("Opened database connection for thread %s, making %s connections opened so far.", thread_name, len(self.connection_thread_names))
+
+
+_DATABASE = _SqliteDatabase(None)
+
+# Note: A set of URL hashes is bound as a single JSON array parameter which is expanded using json_each.
+# "CROSS JOIN" makes json_each the outer loop of the join, thereby searching the index once per URL hash. The planner otherwise scans the index of the channel.
+_SQL_DELETE_POSTED: Final = "DELETE FROM post WHERE (channel = ?) AND (feed = ?) AND (url IN (SELECT value FROM json_each(?)))"
+_SQL_INSERT_POSTED: Final = "INSERT INTO post (channel, feed, url, hour) SELECT ?, ?, value, ? FROM json_each(?)"
+_SQL_SELECT_POSTED_FOR_CHANNEL: Final = "SELECT post.url FROM json_each(?) AS hashes CROSS JOIN post ON (post.channel = ?) AND (post.url = hashes.value)"
+_SQL_SELECT_POSTED_FOR_CHANNEL_FEED: Final = "SELECT post.url FROM json_each(?) AS hashes CROSS JOIN post ON (post.channel = ?) AND (post.feed = ?) AND (post.url = hashes.value)"
+_SQL_SELECT_MIGRATED: Final = {  # Keyed by the filename of a previous version of the database, newest first. Each selects its rows for the current version.
+    "posts.v3.db": "SELECT channel, feed, url, hour FROM old.post ORDER BY channel, feed, url;",
+    "posts.v2.db": "SELECT channel, feed, url, :hour FROM old.post ORDER BY channel, feed, url;",  # The posted hour is unknown for v2, so it is the hour of migration.
+}
 
 
 class Post(peewee.Model):
@@ -20,17 +65,141 @@ class Post(peewee.Model):
     channel = peewee.BigIntegerField(null=False, verbose_name="signed hash of channel name")
     feed = peewee.BigIntegerField(null=False, verbose_name="signed hash of feed name")
     url = peewee.BigIntegerField(null=False, verbose_name="signed hash of long URL")
+    hour = peewee.IntegerField(null=False, verbose_name="posted time as whole hours since the Unix epoch")  # This uses 3 bytes per row, unlike 4 or more for seconds.
 
     class Meta:  # pylint: disable=missing-class-docstring
         database = _DATABASE
         legacy_table_names = False  # This will become a default in peewee>=4
         primary_key = peewee.CompositeKey("channel", "feed", "url")
+        without_rowid = True  # The table is then clustered on the primary key, unlike having a separate rowid table and primary key index.
         indexes = (
-            # (('channel', 'feed', 'url'), True),  # Not needed per EXPLAIN QUERY PLAN due to sqlite_autoindex_post_1.
-            (("channel", "url"), False),
+            # (('channel', 'feed', 'url'), True),  # Not needed per EXPLAIN QUERY PLAN due to the primary key.
+            (("channel", "url"), False),  # This also includes feed because it is in the primary key.
+            (("channel", "feed", "hour"), False),  # This covers selecting the recently posted URL hashes of a feed, because url is in the primary key.
         )  # True means unique.
 
 
+def _hour() -> int:
+    """Return the current time as whole hours since the Unix epoch."""
+    return int(time.time() // 3600)
+
+
+def _migrate(db_path_old: Path, db_path: Path) -> None:
+    """Create the database from a database of a previous version, leaving the latter unchanged.
+
+    The rows are streamed in primary key order into a temporary file which is renamed upon completion.
+    """
+    log.info("Migrating database having path %s and size %s to database having path %s.", db_path_old, humanize_bytes(db_path_old.stat().st_size), db_path)
+    timer = Timer()
+    db_path_migration = db_path.with_name(f"{db_path.name}.migration")
+    for path in (db_path_migration, db_path_migration.with_name(f"{db_path_migration.name}-wal"), db_path_migration.with_name(f"{db_path_migration.name}-shm")):
+        path.unlink(missing_ok=True)  # Note: A preexisting file is from an interrupted migration.
+    db = peewee.SqliteDatabase(db_path_migration, pragmas=config.DB_PRAGMAS)
+    with db.bind_ctx([Post]):
+        db.create_tables([Post])
+    db.execute_sql("ATTACH DATABASE ? AS old;", (str(db_path_old),))
+    with db.atomic():
+        cursor = db.execute_sql(f"INSERT INTO main.post (channel, feed, url, hour) {_SQL_SELECT_MIGRATED[db_path_old.name]}", {"hour": _hour()})
+    num_rows = cursor.rowcount
+    db.execute_sql("DETACH DATABASE old;")
+    db.close()  # Note: This checkpoints and removes the write-ahead log.
+    db_path_migration.rename(db_path)
+    log.info("Migrated %s rows to database having size %s in %s.", f"{num_rows:,}", humanize_bytes(db_path.stat().st_size), timer)
+
+
+class PostedHashes:
+    """In-memory set of posted URL hashes.
+
+    The hashes are held in a sorted array. Newly posted hashes are held in a set until they are merged into the array.
+    An instance is safe for lookups by multiple threads, but it must be updated by one thread at a time.
+    """
+
+    def __init__(self, hashes: array.array):
+        self._hashes = hashes  # Sorted.
+        self._pending: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._pending)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the approximate number of bytes used by the hashes."""
+        return (self._hashes.itemsize * len(self._hashes)) + (len(self._pending) * 64)  # Approximate for a set of ints.
+
+    def add(self, hashes: Iterable[int]) -> None:
+        """Add the given hashes."""
+        self._pending.update(hashes)
+        if len(self._pending) > config.DB_POSTED_HASHES_PENDING_MAX:
+            self._merge()
+
+    def _merge(self) -> None:
+        """Merge the pending hashes into the array."""
+        hashes = self._hashes
+        merged_hashes = array.array("q")
+        start = 0
+        for hash_ in sorted(self._pending):
+            index = bisect.bisect_left(hashes, hash_, lo=start)
+            merged_hashes.extend(hashes[start:index])
+            start = index
+            if (index == len(hashes)) or (hashes[index] != hash_):  # The pending hashes can overlap with the hashes of a concurrently loaded array.
+                merged_hashes.append(hash_)
+        merged_hashes.extend(hashes[start:])
+        self._hashes = merged_hashes
+        self._pending = set()  # Note: This is replaced after the array for the sake of concurrent lookups.
+
+    def select_posted(self, hashes: Iterable[int]) -> Set[int]:
+        """Return the given hashes which are posted."""
+        pending = self._pending  # Note: This is read before the array for the sake of concurrent merges.
+        posted_hashes = self._hashes
+        num_posted_hashes = len(posted_hashes)
+        return {h for h in hashes if (h in pending) or (((index := bisect.bisect_left(posted_hashes, h)) < num_posted_hashes) and (posted_hashes[index] == h))}
+
+
+@dataclasses.dataclass(frozen=True)
+class _Insertion:
+    """Posted URL hashes of a channel and feed which are queued for insertion."""
+
+    channel: str
+    feed: str
+    channel_hash: int
+    feed_hash: int
+    url_hashes: List[int]
+    queue_time: float = dataclasses.field(default_factory=time.monotonic)
+
+
+@dataclasses.dataclass
+class CommitStats:
+    """Statistics of the group commits of the database writer."""
+
+    num_commits: int = 0
+    num_insertions: int = 0
+    num_rows: int = 0
+    commit_seconds_total: float = 0
+    commit_seconds_max: float = 0
+    latency_seconds_total: float = 0  # From the queueing of an insertion to its commit.
+    latency_seconds_max: float = 0
+
+    def __str__(self) -> str:
+        if not self.num_commits:
+            return "0 commits"
+        return (
+            f"{self.num_commits:,} commits of {self.num_insertions:,} insertions having {self.num_rows:,} rows, "
+            f"with a mean commit time of {self.commit_seconds_total / self.num_commits * 1000:.1f}ms and a max of {self.commit_seconds_max * 1000:.1f}ms, "
+            f"and a mean insertion latency of {self.latency_seconds_total / self.num_insertions * 1000:.1f}ms and a max of {self.latency_seconds_max * 1000:.1f}ms"
+        )
+
+    def update(self, insertions: List[_Insertion], commit_seconds: float, commit_time: float) -> None:
+        """Update the statistics with a commit of the given insertions."""
+        latencies = [commit_time - insertion.queue_time for insertion in insertions]
+        self.num_commits += 1
+        self.num_insertions += len(insertions)
+        self.num_rows += sum(len(insertion.url_hashes) for insertion in insertions)
+        self.commit_seconds_total += commit_seconds
+        self.commit_seconds_max = max(self.commit_seconds_max, commit_seconds)
+        self.latency_seconds_total += sum(latencies)
+        self.latency_seconds_max = max(self.latency_seconds_max, *latencies)
+
+
 class Database:
     """Database interface via an ORM."""
 
@@ -38,49 +207,121 @@ class Database:
         # Initialize db
         log.debug("Initializing database.")
         db_path = config.INSTANCE["dir"] / config.DB_FILENAME
-        _DATABASE.init(db_path)  # If facing threading issues, consider https://stackoverflow.com/a/39024742/
+        if not db_path.exists():
+            for db_path_old in (config.INSTANCE["dir"] / filename for filename in _SQL_SELECT_MIGRATED):
+                if db_path_old.exists():
+                    _migrate(db_path_old, db_path)
+                    break
+        _DATABASE.init(db_path, pragmas=config.DB_PRAGMAS)  # Note: Each thread uses its own connection.
         self._db = _DATABASE
         self._db.create_tables([Post])
-        self._write_lock = threading.Lock()  # Unclear if necessary, but used anyway for safety.
-        log.info("Initialized database having path %s.", db_path)
-
-        # Vacuum db
-        pre_vacuum_size = db_path.stat().st_size
-        log.debug("Vacuuming database having pre-vacuum size %s.", humanize_bytes(pre_vacuum_size))
-        self._db.execute_sql("VACUUM;")
-        post_vacuum_size = db_path.stat().st_size
-        vacuum_size_diff = pre_vacuum_size - post_vacuum_size
-        log.info("Vacuumed database having post-vacuum size %s, saving %s.", humanize_bytes(post_vacuum_size), humanize_bytes(vacuum_size_diff))
+        self._posted_hashes_by_key: Dict[Tuple[int, ...], PostedHashes] = {}  # Keyed by (channel_hash,) and (channel_hash, feed_hash). Each is loaded lazily.
+        self._posted_hashes_lock = threading.Lock()
+        self._listed_posted_hashes: Dict[Tuple[int, int], Set[int]] = {}  # Keyed by (channel_hash, feed_hash). These are as of the latest read, and are protected from pruning.
+        self._listed_posted_hashes_lock = threading.Lock()
+        self._db_path = db_path
+        timer = Timer()
+        cursor = self._db.execute_sql("SELECT DISTINCT channel, feed FROM post;")  # This skips ahead through the primary key if the database has been analyzed.
+        self._posted_feed_keys: Set[Tuple[int, int]] = set(cursor)  # Keyed by (channel_hash, feed_hash). This includes uncommitted insertions.
+        log.info(
+            "Initialized database having path %s and size %s, loading %s posted feeds of %s channels in %s.",
+            db_path,
+            humanize_bytes(db_path.stat().st_size),
+            f"{len(self._posted_feed_keys):,}",
+            len({k[0] for k in self._posted_feed_keys}),
+            timer,
+        )
 
-        # Analyze db
-        log.debug("Analyzing database.")
-        self._db.execute_sql("ANALYZE;")
-        log.info("Analyzed database.")
+        # Start writer
+        self._write_queue: queue.SimpleQueue[Union[_Insertion, threading.Event]] = queue.SimpleQueue()
+        self._uncommitted_insertions: List[_Insertion] = []  # These are readable from the database only after they are committed by the writer.
+        self._uncommitted_insertions_lock = threading.Lock()
+        self.commit_stats = CommitStats()
+        self._maintenance_time = time.monotonic() + config.DB_MAINTENANCE_DELAY  # Note: Maintenance is not done at startup so as to not delay it.
+        threading.Thread(target=self._write, name="DatabaseWriter", daemon=True).start()
+        atexit.register(self.flush)  # Note: This is not used by os._exit.
 
         # Helper function:
         # sql = lambda *s: list(self._db.execute_sql(*s))
 
-    @staticmethod
-    def _select_unposted(conditions: peewee.Expression, urls: List[str]) -> List[str]:
-        hashes2urls = Int8Hash.as_dict(urls)
-        posted_hashes: Set[int] = set()
-        for hashes_batch in chunked(hashes2urls, 100):  # Ref: https://www.sqlite.org/limits.html#max_variable_number
-            conditions_batch = conditions & Post.url.in_(hashes_batch)
-            posted_hashes |= {post[0] for post in Post.select(Post.url).where(conditions_batch).tuples().iterator()}
-        unposted_urls = [url for url_hash, url in hashes2urls.items() if url_hash not in posted_hashes]
-        return unposted_urls
+    def _posted_hashes(self, channel_hash: int, feed_hash: Optional[int] = None) -> PostedHashes:
+        """Return the posted URL hashes of the given channel hash, and optionally of the given feed hash, loading them from the database if necessary."""
+        key = (channel_hash,) if (feed_hash is None) else (channel_hash, feed_hash)
+        if (posted_hashes := self._posted_hashes_by_key.get(key)) is not None:
+            return posted_hashes
+        lock_timer = Timer()
+        with self._posted_hashes_lock:  # Note: This is also waited for by the insertions, so they are not lost by a concurrent load.
+            if (posted_hashes := self._posted_hashes_by_key.get(key)) is None:
+                lock_seconds, timer = lock_timer(), Timer()
+                uncommitted_insertions = self._select_uncommitted_insertions(channel_hash, feed_hash)  # Note: This is read before the database for the sake of concurrent commits.
+                conditions = (Post.channel == channel_hash) if (feed_hash is None) else ((Post.channel == channel_hash) & (Post.feed == feed_hash))
+                query = Post.select(Post.url).where(conditions).order_by(Post.url)  # This is a scan of a covering index.
+                cursor = self._db.execute_sql(*query.sql())
+                posted_hashes = self._posted_hashes_by_key[key] = PostedHashes(array.array("q", (row[0] for row in cursor)))
+                for insertion in uncommitted_insertions:
+                    posted_hashes.add(insertion.url_hashes)
+                log.info(
+                    "Loaded %s posted URL hashes from the database for %s in %s after waiting %.1fms for the lock, using %s of memory. "
+                    "The total memory used by %s loaded sets of posted URL hashes is %s.",
+                    f"{len(posted_hashes):,}",
+                    f"channel hash {channel_hash}" if (feed_hash is None) else f"channel hash {channel_hash} having feed hash {feed_hash}",
+                    timer,
+                    lock_seconds * 1000,
+                    humanize_bytes(posted_hashes.nbytes),
+                    len(self._posted_hashes_by_key),
+                    humanize_bytes(self.posted_hashes_nbytes),
+                )
+        return posted_hashes
+
+    def _select_posted_hashes(self, channel_hash: int, url_hashes: List[int], feed_hash: Optional[int] = None) -> Set[int]:
+        """Return the given URL hashes which are in the database for the given channel hash, and optionally for the given feed hash.
+
+        A single query is used irrespective of the number of URL hashes.
+        """
+        if feed_hash is None:
+            cursor = self._db.execute_sql(_SQL_SELECT_POSTED_FOR_CHANNEL, (json.dumps(url_hashes), channel_hash))
+        else:
+            cursor = self._db.execute_sql(_SQL_SELECT_POSTED_FOR_CHANNEL_FEED, (json.dumps(url_hashes), channel_hash, feed_hash))
+        return {row[0] for row in cursor}
+
+    def _select_uncommitted_insertions(self, channel_hash: int, feed_hash: Optional[int] = None) -> List[_Insertion]:
+        """Return the insertions of the given channel hash, and optionally of the given feed hash, which are not yet committed, newest first."""
+        with self._uncommitted_insertions_lock:
+            return [i for i in reversed(self._uncommitted_insertions) if (i.channel_hash == channel_hash) and ((feed_hash is None) or (i.feed_hash == feed_hash))]
+
+    @property
+    def posted_hashes_nbytes(self) -> int:
+        """Return the approximate number of bytes used by the loaded posted URL hashes."""
+        return sum(posted_hashes.nbytes for posted_hashes in list(self._posted_hashes_by_key.values()))
+
+    def is_new_feed(self, channel: str, feed: str) -> bool:
+        """Return whether the specified feed name is new or not by checking whether it has entries in the database, including uncommitted insertions.
 
-    @staticmethod
-    def is_new_feed(channel: str, feed: str) -> bool:
-        """Return whether the specified feed name is new or not by checking whether it has entries in the database."""
-        conditions = (Post.channel == Int8Hash.as_int(channel)) & (Post.feed == Int8Hash.as_int(feed))
-        return not Post.select(Post.url).where(conditions).limit(1)
+        This is a lookup in the posted feeds which are loaded at startup and are updated by the insertions and by pruning.
+        """
+        return (Int8Hash.as_int(channel), Int8Hash.as_int(feed)) not in self._posted_feed_keys
+
+    def select_recently_posted_hashes(self, channel: str, feed: str, limit: int) -> List[int]:
+        """Return up to the given number of the most recently inserted URL hashes for the given channel and feed.
+
+        The URL hashes which were committed in the same hour are in an arbitrary order.
+        This includes the URL hashes which were migrated from a v2 database, all of which have the hour of the migration.
+        They are therefore not ordered by recency until the feed has posted more in a later hour.
+        """
+        channel_hash, feed_hash = Int8Hash.as_int(channel), Int8Hash.as_int(feed)
+        uncommitted_hashes = [h for i in self._select_uncommitted_insertions(channel_hash, feed_hash) for h in reversed(i.url_hashes)][:limit]
+        conditions = (Post.channel == channel_hash) & (Post.feed == feed_hash)
+        query = Post.select(Post.url).where(conditions).order_by(Post.hour.desc()).limit(limit)
+        return list(dict.fromkeys(uncommitted_hashes + [post[0] for post in query.tuples().iterator()]))[
+            :limit
+        ]  # A committed insertion can be both uncommitted and in the database.
 
     def select_unposted_for_channel(self, channel: str, feed: str, urls: List[str]) -> List[str]:
         """Return unposted URLs for the given channel."""
         log.debug("Retrieving unposted URLs from the database for channel %s having ignored feed %s out of %s URLs.", channel, feed, len(urls))
-        conditions = Post.channel == Int8Hash.as_int(channel)
-        unposted_urls = self._select_unposted(conditions, urls)
+        hashes2urls = Int8Hash.as_dict(urls)
+        posted_hashes = self._posted_hashes(Int8Hash.as_int(channel)).select_posted(hashes2urls)
+        unposted_urls = [url for url_hash, url in hashes2urls.items() if url_hash not in posted_hashes]
         loglevel = logging.INFO if len(unposted_urls) > 0 else logging.DEBUG
         log.log(loglevel, "Returning %s unposted URLs from the database for channel %s having ignored feed %s out of %s URLs.", len(unposted_urls), channel, feed, len(urls))
         return unposted_urls
@@ -88,20 +329,395 @@ class Database:
     def select_unposted_for_channel_feed(self, channel: str, feed: str, urls: List[str]) -> List[str]:
         """Return unposted URLs for the given channel and feed."""
         log.debug("Retrieving unposted URLs from the database for channel %s having feed %s out of %s URLs.", channel, feed, len(urls))
-        conditions = (Post.channel == Int8Hash.as_int(channel)) & (Post.feed == Int8Hash.as_int(feed))
-        unposted_urls = self._select_unposted(conditions, urls)
+        hashes2urls = Int8Hash.as_dict(urls)
+        posted_hashes = self._posted_hashes(Int8Hash.as_int(channel), Int8Hash.as_int(feed)).select_posted(hashes2urls)
+        unposted_urls = [url for url_hash, url in hashes2urls.items() if url_hash not in posted_hashes]
         loglevel = logging.INFO if len(unposted_urls) > 0 else logging.DEBUG
         log.log(loglevel, "Returning %s unposted URLs from the database for channel %s having feed %s out of %s URLs.", len(unposted_urls), channel, feed, len(urls))
         return unposted_urls
 
     def insert_posted(self, channel: str, feed: str, urls: List[str]) -> None:
-        """Insert the given URLs for the given channel and feed."""
-        log.debug("Inserting %s URLs into the database for channel %s having feed %s.", len(urls), channel, feed)
-        channel_hash, feed_hash, urls_hashes = Int8Hash.as_int(channel), Int8Hash.as_int(feed), Int8Hash.as_list(urls)
-        data = ({"channel": channel_hash, "feed": feed_hash, "url": url_hash} for url_hash in urls_hashes)
-        with self._write_lock, self._db.atomic():
-            for batch in chunked(data, 100):  # Ref: https://www.sqlite.org/limits.html#max_variable_number
-                Post.insert_many(batch).execute()  # pylint: disable=no-value-for-parameter
-                # Note: "sqlite3.IntegrityError: UNIQUE constraint failed" would be indicative of a bug elsewhere.
-                # As such, prepending ".on_conflict_ignore()" before ".execute()" should not be needed.
-        log.info("Inserted %s URLs into the database for channel %s having feed %s.", len(urls), channel, feed)
+        """Queue the given URLs for insertion for the given channel and feed.
+
+        The URLs are immediately treated as posted by the other methods, but they are committed to the database by the writer thread.
+        """
+        log.debug("Queuing %s URLs for insertion into the database for channel %s having feed %s.", len(urls), channel, feed)
+        insertion = _Insertion(channel=channel, feed=feed, channel_hash=Int8Hash.as_int(channel), feed_hash=Int8Hash.as_int(feed), url_hashes=Int8Hash.as_list(urls))
+        lock_timer = Timer()
+        with self._posted_hashes_lock:
+            lock_seconds = lock_timer()
+            for key in ((insertion.channel_hash,), (insertion.channel_hash, insertion.feed_hash)):
+                if (posted_hashes := self._posted_hashes_by_key.get(key)) is not None:  # Otherwise the hashes will be loaded from the database when needed.
+                    posted_hashes.add(insertion.url_hashes)
+            self._posted_feed_keys.add((insertion.channel_hash, insertion.feed_hash))
+            with self._uncommitted_insertions_lock:
+                self._uncommitted_insertions.append(insertion)
+            self._write_queue.put(insertion)
+        log.info("Queued %s URLs for insertion into the database for channel %s having feed %s after waiting %.1fms for the lock.", len(urls), channel, feed, lock_seconds * 1000)
+
+    def protect_listed_posted(self, channel: str, feed: str, urls: Iterable[str]) -> None:
+        """Protect the given posted URLs, which are currently listed by the given channel and feed, from being pruned until the feed is read again.
+
+        They replace the URLs which were protected by the previous read of the feed.
+        They are protected for the entire channel, thereby also accounting for deduplication across its feeds.
+        """
+        url_hashes = set(Int8Hash.as_list(list(urls)))
+        with self._listed_posted_hashes_lock:
+            self._listed_posted_hashes[(Int8Hash.as_int(channel), Int8Hash.as_int(feed))] = url_hashes
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the writer thread to commit all queued insertions, returning whether they were committed within the given timeout."""
+        flushed = threading.Event()
+        self._write_queue.put(flushed)
+        return flushed.wait(timeout)
+
+    def _write(self) -> None:
+        """Commit queued insertions in groups, and maintain the database when it is due and quiet, until the process exits.
+
+        Each group consists of the insertions which were queued while the previous group was being committed.
+        Insertions which are queued during maintenance are committed after it.
+        """
+        log.debug("Database writer has started.")
+        while True:
+            try:
+                items: List[Union[_Insertion, threading.Event]] = [self._write_queue.get(timeout=config.DB_MAINTENANCE_QUIET_SECONDS)]
+            except queue.Empty:
+                if time.monotonic() >= self._maintenance_time:
+                    self._maintenance_time = time.monotonic() + config.DB_MAINTENANCE_PERIOD
+                    try:
+                        self._maintain()
+                    except Exception as exc:  # pylint: disable=broad-except
+                        log.exception(f"Error maintaining the database: {exc}")
+                continue
+            while len(items) < config.DB_GROUP_COMMIT_INSERTIONS_MAX:
+                try:
+                    items.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if insertions := [item for item in items if isinstance(item, _Insertion)]:
+                try:
+                    self._commit(insertions)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.exception(f"Error committing {len(insertions)} insertions into the database: {exc}")  # Note: This prevents the writer from stopping.
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _commit(self, insertions: List[_Insertion], *, skip_posted: bool = False) -> None:
+        """Commit the given insertions in a single transaction.
+
+        Upon an error, each insertion is retried in its own transaction, skipping its URL hashes which are already in the database.
+        """
+        timer, hour = Timer(), _hour()
+        try:
+            with self._db.atomic():
+                for insertion in insertions:
+                    url_hashes = insertion.url_hashes
+                    if skip_posted and (posted_hashes := self._select_posted_hashes(insertion.channel_hash, url_hashes, insertion.feed_hash)):
+                        config.runtime.alert(
+                            f"Skipping {len(posted_hashes)} of {len(url_hashes)} URLs for channel {insertion.channel} having feed {insertion.feed} "
+                            "because they are already in the database. This is indicative of a bug elsewhere.",
+                            log.warning,
+                        )
+                        url_hashes = [h for h in url_hashes if h not in posted_hashes]
+                    self._db.execute_sql(_SQL_INSERT_POSTED, (insertion.channel_hash, insertion.feed_hash, hour, json.dumps(url_hashes)))
+                    # Note: "sqlite3.IntegrityError: UNIQUE constraint failed" would be indicative of a bug elsewhere.
+        except Exception as exc:  # pylint: disable=broad-except
+            if not skip_posted:
+                log.warning(
+                    f"Error committing a group of {len(insertions)} insertions into the database. "
+                    f"They will be committed one at a time, skipping any URLs which are already in the database. The error is: {exc}"
+                )
+                for insertion in insertions:
+                    self._commit([insertion], skip_posted=True)
+                return
+            insertion = insertions[0]
+            config.runtime.alert(f"Error committing {len(insertion.url_hashes)} URLs into the database for channel {insertion.channel} having feed {insertion.feed}: {exc}")
+        else:
+            commit_seconds = timer()
+            self.commit_stats.update(insertions, commit_seconds, time.monotonic())
+            log.info(
+                "Committed %s URLs of %s insertions into the database in %.1fms. The total is %s.",
+                sum(len(i.url_hashes) for i in insertions),
+                len(insertions),
+                commit_seconds * 1000,
+                self.commit_stats,
+            )
+        with self._uncommitted_insertions_lock:
+            committed = {id(i) for i in insertions}
+            self._uncommitted_insertions = [i for i in self._uncommitted_insertions if id(i) not in committed]
+
+    def _retention_hours(self) -> Dict[Tuple[int, int], int]:
+        """Return the retention in hours by channel hash and feed hash for the feeds which are to be pruned.
+
+        A configured feed is pruned only after it has been read, so that the posted URLs which it currently lists are protected.
+        Its retention is at least its `max_age`, if any, because entries within it are not removed by their age.
+        A feed which is in the database but is no longer configured uses the default retention.
+        """
+        defaults = config.INSTANCE.get("defaults", {})
+        retention_hours: Dict[Tuple[int, int], Optional[int]] = {}
+        with self._listed_posted_hashes_lock:
+            read_keys = set(self._listed_posted_hashes)
+        for channel, channel_config in config.INSTANCE.get("feeds", {}).items():
+            for feed, feed_config in channel_config.items():
+                key, feed_config = (Int8Hash.as_int(channel), Int8Hash.as_int(feed)), {**defaults, **feed_config}
+                retention_hours[key] = None
+                if (retention := feed_config.get("retention")) and (key in read_keys):
+                    max_age = feed_config.get("max_age")
+                    max_age = 0 if isinstance(max_age, bool) else (max_age or 0)
+                    retention_hours[key] = math.ceil(max(retention * 24, max_age))
+        if default_retention := defaults.get("retention"):
+            for key in list(self._posted_feed_keys):
+                retention_hours.setdefault(key, math.ceil(default_retention * 24))
+        return {key: hours for key, hours in retention_hours.items() if hours is not None}
+
+    def _protected_hashes(self) -> Dict[int, Set[int]]:
+        """Return the posted URL hashes which are protected from pruning by channel hash."""
+        protected_hashes: Dict[int, Set[int]] = {}
+        with self._listed_posted_hashes_lock:
+            for (channel_hash, _), url_hashes in self._listed_posted_hashes.items():
+                protected_hashes.setdefault(channel_hash, set()).update(url_hashes)
+        return protected_hashes
+
+    def _prune(self) -> int:
+        """Delete the posted URL hashes which are older than the retention of their feed, in batches, returning the number of deleted rows.
+
+        The posted URL hashes which are listed by any feed of the channel as of its latest read are not deleted.
+        """
+        timer, hour = Timer(), _hour()
+        retention_hours, protected_hashes = self._retention_hours(), self._protected_hashes()
+        num_rows, num_protected, pruned_feed_keys = 0, 0, []
+        for key, hours in retention_hours.items():
+            num_feed_rows, num_feed_protected = self._prune_feed(*key, hour - hours, protected_hashes.get(key[0], set()))
+            num_protected += num_feed_protected
+            if num_feed_rows:
+                log.debug("Pruned %s rows older than %s hours for channel hash %s having feed hash %s.", f"{num_feed_rows:,}", hours, *key)
+                num_rows += num_feed_rows
+                pruned_feed_keys.append(key)
+        pruned_channel_hashes = {k[0] for k in pruned_feed_keys}
+        with self._posted_hashes_lock:  # Note: The loaded posted URL hashes are reloaded from the database when needed.
+            for key in [k for k in self._posted_hashes_by_key if k[0] in pruned_channel_hashes]:
+                del self._posted_hashes_by_key[key]
+            for key in pruned_feed_keys:  # Note: Insertions are queued while holding the lock, and they are committed only by this thread.
+                conditions = (Post.channel == key[0]) & (Post.feed == key[1])
+                if not (self._select_uncommitted_insertions(*key) or Post.select(Post.url).where(conditions).limit(1)):
+                    self._posted_feed_keys.discard(key)  # The feed is thereby new again.
+        log.info(
+            "Pruned %s rows of %s feeds out of %s having a retention, skipping %s old rows which are listed, in %.1fms.",
+            f"{num_rows:,}",
+            len(pruned_feed_keys),
+            len(retention_hours),
+            f"{num_protected:,}",
+            timer() * 1000,
+        )
+        return num_rows
+
+    def _prune_feed(self, channel_hash: int, feed_hash: int, min_hour: int, protected_hashes: Set[int]) -> Tuple[int, int]:
+        """Delete the unprotected posted URL hashes of the given channel hash and feed hash which are older than the given hour, in batches.
+
+        The number of deleted rows and the number of old rows which were protected are returned.
+        """
+        cursor = self._db.execute_sql("SELECT url FROM post WHERE (channel = ?) AND (feed = ?) AND (hour < ?);", (channel_hash, feed_hash, min_hour))
+        old_hashes = [row[0] for row in cursor]
+        url_hashes = [h for h in old_hashes if h not in protected_hashes]
+        for url_hashes_batch in chunked(url_hashes, config.DB_PRUNE_BATCH_SIZE):
+            with self._db.atomic():
+                self._db.execute_sql(_SQL_DELETE_POSTED, (channel_hash, feed_hash, json.dumps(url_hashes_batch)))
+        return len(url_hashes), len(old_hashes) - len(url_hashes)
+
+    def _maintain(self) -> None:
+        """Maintain the database, logging the duration of each step.
+
+        Posted URL hashes which are older than the retention of their feed are pruned.
+        The statistics used by the query planner are updated approximately.
+        Free pages are released by an incremental vacuum, or by a full vacuum if their ratio is high or if incremental vacuuming is not yet enabled for the database.
+        """
+        timer, pre_maintenance_size = Timer(), self._db_path.stat().st_size
+        log.info(
+            "Maintaining database having file size %s and %s connections opened so far by threads.",
+            humanize_bytes(pre_maintenance_size),
+            len(self._db.connection_thread_names),
+        )
+
+        # Prune db
+        self._prune()
+        page_size, page_count, freelist_count = self._db.pragma("page_size"), self._db.pragma("page_count"), self._db.pragma("freelist_count")
+        log.info("The database has %s free in %s out of %s pages.", humanize_bytes(freelist_count * page_size), f"{freelist_count:,}", f"{page_count:,}")
+
+        # Analyze db
+        step_timer = Timer()
+        self._db.execute_sql(f"PRAGMA analysis_limit = {config.DB_ANALYSIS_LIMIT};")
+        self._db.execute_sql("ANALYZE;")  # Note: "PRAGMA optimize" is not used because it considers only the tables which were queried by the same connection.
+        log.info("Analyzed database approximately in %.1fms.", step_timer() * 1000)
+
+        # Vacuum db
+        step_timer = Timer()
+        freelist_ratio = freelist_count / page_count
+        if (self._db.pragma("auto_vacuum") != 2) or (freelist_ratio >= config.DB_VACUUM_FREELIST_RATIO_MIN):  # 2 means incremental.
+            log.debug("Vacuuming database fully having auto_vacuum mode %s and free page ratio %.3f.", self._db.pragma("auto_vacuum"), freelist_ratio)
+            self._db.execute_sql("VACUUM;")
+            log.info("Vacuumed database fully in %.1fms.", step_timer() * 1000)
+        elif freelist_count > 0:
+            self._db.execute_sql("PRAGMA incremental_vacuum;").fetchall()  # Note: The pages are freed as the statement is stepped through.
+            log.info("Vacuumed database incrementally in %.1fms.", step_timer() * 1000)
+
+        # Checkpoint db
+        step_timer = Timer()
+        busy, num_wal_pages, num_checkpointed_pages = self._db.execute_sql("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+        log.info(
+            "Checkpointed %s out of %s pages of the write-ahead log of the database in %.1fms.%s",
+            f"{num_checkpointed_pages:,}",
+            f"{num_wal_pages:,}",
+            step_timer() * 1000,
+            " The checkpoint was incomplete due to concurrent readers." if busy else "",
+        )
+
+        post_maintenance_size = self._db_path.stat().st_size
+        log.info(
+            "Maintained database in %.1fms, reclaiming %s, resulting in file size %s and %s free pages out of %s.",
+            timer() * 1000,
+            humanize_bytes(max(0, pre_maintenance_size - post_maintenance_size)),
+            humanize_bytes(post_maintenance_size),
+            f"{self._db.pragma('freelist_count'):,}",
+            f"{self._db.pragma('page_count'):,}",
+        )
+
+
+# pylint: disable=missing-class-docstring,missing-function-docstring
+class TestDatabase(unittest.TestCase):
+    db: Database
+
+    @classmethod
+    def setUpClass(cls):
+        config.INSTANCE["dir"] = Path(tempfile.mkdtemp())
+        config.runtime.alert = lambda msg, logger=log.exception: logger(msg)
+        cls.db = Database()
+
+    def _query_plan(self, sql: str, params: tuple) -> List[str]:
+        return [row[-1] for row in self.db._db.execute_sql(f"EXPLAIN QUERY PLAN {sql}", params)]  # pylint: disable=protected-access
+
+    def test_query_plans(self):
+        self.assertEqual(
+            self._query_plan(_SQL_SELECT_POSTED_FOR_CHANNEL, ("[1, 2]", 3)),
+            ["SCAN hashes VIRTUAL TABLE INDEX 1:", "SEARCH post USING COVERING INDEX post_channel_url (channel=? AND url=?)"],
+        )
+        self.assertEqual(
+            self._query_plan(_SQL_SELECT_POSTED_FOR_CHANNEL_FEED, ("[1, 2]", 3, 4)),
+            ["SCAN hashes VIRTUAL TABLE INDEX 1:", "SEARCH post USING COVERING INDEX post_channel_url (channel=? AND url=? AND feed=?)"],
+        )
+
+    def test_query_plan_recently_posted(self):
+        query = Post.select(Post.url).where((Post.channel == 1) & (Post.feed == 2)).order_by(Post.hour.desc()).limit(3)
+        with self.db._db.bind_ctx([Post]):  # pylint: disable=protected-access
+            self.assertEqual(self._query_plan(*query.sql()), ["SEARCH t1 USING COVERING INDEX post_channel_feed_hour (channel=? AND feed=?)"])
+
+    def test_connections(self):
+        thread = threading.Thread(target=self.db.select_recently_posted_hashes, args=("#c", "f", 1), name="TestReader")
+        thread.start()
+        thread.join()
+        self.assertIn(thread.name, self.db._db.connection_thread_names)  # pylint: disable=protected-access
+
+    def test_select_posted_hashes(self):
+        channel_hash, feed_hashes = Int8Hash.MIN, (0, 1)
+        self.db._commit([_Insertion("#c", f"f{f}", channel_hash, f, [Int8Hash.MIN, f, Int8Hash.MAX]) for f in feed_hashes])  # pylint: disable=protected-access
+        url_hashes = [Int8Hash.MIN, Int8Hash.MAX, 0, 1, -1]
+        self.assertEqual(self.db._select_posted_hashes(channel_hash, url_hashes), {Int8Hash.MIN, Int8Hash.MAX, 0, 1})  # pylint: disable=protected-access
+        self.assertEqual(self.db._select_posted_hashes(channel_hash, url_hashes, 0), {Int8Hash.MIN, Int8Hash.MAX, 0})  # pylint: disable=protected-access
+        self.assertEqual(self.db._select_posted_hashes(channel_hash, url_hashes, 1), {Int8Hash.MIN, Int8Hash.MAX, 1})  # pylint: disable=protected-access
+        self.assertEqual(self.db._select_posted_hashes(channel_hash, []), set())  # pylint: disable=protected-access
+        self.assertEqual(self.db._select_posted_hashes(channel_hash + 1, url_hashes), set())  # pylint: disable=protected-access
+
+    def test_commit_skipping_posted(self):
+        channel_hash, feed_hash = 1, 2
+        with self.assertLogs(log, logging.WARNING):
+            self.db._commit([_Insertion("#c", "f", channel_hash, feed_hash, [1, 2]), _Insertion("#c", "f", channel_hash, feed_hash, [2, 3])])  # pylint: disable=protected-access
+        self.assertEqual(self.db._select_posted_hashes(channel_hash, [1, 2, 3, 4], feed_hash), {1, 2, 3})  # pylint: disable=protected-access
+
+    def test_maintain(self):
+        channel_hash, feed_hash = 3, 4
+        self.db._commit([_Insertion("#c", "f", channel_hash, feed_hash, list(range(10_000)))])  # pylint: disable=protected-access
+        self.db._db.execute_sql("DELETE FROM post WHERE (channel = ?) AND (url >= 5000)", (channel_hash,))  # pylint: disable=protected-access
+        self.assertGreater(self.db._db.pragma("freelist_count"), 0)  # pylint: disable=protected-access
+        self.db._maintain()  # pylint: disable=protected-access
+        self.assertEqual(self.db._db.pragma("auto_vacuum"), 2)  # pylint: disable=protected-access
+        self.assertEqual(self.db._db.pragma("freelist_count"), 0)  # pylint: disable=protected-access
+        self.assertTrue(self.db._db.table_exists("sqlite_stat1"))  # pylint: disable=protected-access
+
+    def test_flush(self):
+        committing = threading.Event()
+        with unittest.mock.patch.object(self.db, "_commit", side_effect=lambda *_args, **_kwargs: committing.wait()):
+            self.db.insert_posted("#flush", "f", ["https://example.com/flush"])
+            self.assertFalse(self.db.flush(timeout=0.1))
+            committing.set()
+            self.assertTrue(self.db.flush(timeout=10))
+
+    def test_prune(self):
+        channel, feed_configs = "#prune", {"f1": {"retention": 1}, "f2": {}, "f3": {"retention": 1, "max_age": 48}}
+        urls = {feed: [f"https://example.com/{feed}/{i}" for i in range(3)] for feed in ("f1", "f2", "f3", "f4")}
+        for feed, feed_urls in urls.items():
+            self.db.insert_posted(channel, feed, feed_urls)
+        self.db.flush()
+
+        def select_urls(feed: str) -> Set[str]:
+            return set(self.db.select_unposted_for_channel_feed(channel, feed, urls[feed]))
+
+        def age(hours: int) -> None:
+            self.db._db.execute_sql("UPDATE post SET hour = hour - ? WHERE channel = ?", (hours, Int8Hash.as_int(channel)))  # pylint: disable=protected-access
+
+        self.db._posted_hashes(Int8Hash.as_int(channel))  # pylint: disable=protected-access
+        self.assertFalse(self.db.is_new_feed(channel, "f4"))
+        with unittest.mock.patch.dict(config.INSTANCE, {"feeds": {channel: feed_configs}, "defaults": {"retention": 3}}):
+            age(30)
+            self.assertEqual(self.db._prune(), 0)  # pylint: disable=protected-access
+            self.db.protect_listed_posted(channel, "f1", urls["f1"][:1])
+            self.db.protect_listed_posted("#other", "f1", urls["f1"][1:2])
+            self.db.protect_listed_posted(channel, "f3", [])
+            self.assertEqual(self.db._prune(), 2)  # pylint: disable=protected-access
+            self.assertEqual(select_urls("f1"), set(urls["f1"][1:]))
+            self.assertNotIn((Int8Hash.as_int(channel),), self.db._posted_hashes_by_key)  # pylint: disable=protected-access
+            age(20)
+            self.assertEqual(self.db._prune(), 3)  # pylint: disable=protected-access
+            self.assertEqual(select_urls("f3"), set(urls["f3"]))
+            age(30)
+            self.assertEqual(self.db._prune(), 3)  # pylint: disable=protected-access
+            self.assertEqual(select_urls("f4"), set(urls["f4"]))
+            self.assertEqual(select_urls("f2"), set())
+            self.assertEqual(select_urls("f1"), set(urls["f1"][1:]))
+            for db in (self.db, Database()):  # The latter loads the posted feeds from the database.
+                self.assertEqual([db.is_new_feed(channel, f) for f in urls], [False, False, True, True])
+
+            # Protect the posted URLs which are listed per read, as by FeedReader._process_entries
+            def read(feed: str, listed_urls: List[str]) -> None:
+                unposted_urls = set(self.db.select_unposted_for_channel_feed(channel, feed, listed_urls))
+                self.db.protect_listed_posted(channel, feed, set(listed_urls) - unposted_urls)
+
+            self.db.insert_posted(channel, "f1", urls["f1"][1:])
+            self.db.flush()
+            age(30)
+            read("f1", urls["f1"])  # All are posted, listed, and older than the retention.
+            self.assertEqual(self.db._prune(), 0)  # pylint: disable=protected-access
+            self.assertEqual(select_urls("f1"), set())
+            read("f1", urls["f1"][2:])  # The others are no longer listed.
+            self.assertEqual(self.db._prune(), 2)  # pylint: disable=protected-access
+            self.assertEqual(select_urls("f1"), set(urls["f1"][:2]))
+
+    def test_migrate(self):
+        rows = [(1, 2, 3, 100), (1, 2, 1, 101), (-1, 0, 2, 102)]
+        columns = {"posts.v2.db": ("channel", "feed", "url"), "posts.v3.db": ("channel", "feed", "url", "hour")}
+        for filename, names in columns.items():
+            with self.subTest(filename=filename):
+                db_dir = Path(tempfile.mkdtemp())
+                with contextlib.closing(sqlite3.connect(db_dir / filename)) as connection:
+                    column_defs = ", ".join(f'"{name}" INTEGER NOT NULL' for name in names)
+                    connection.execute(f'CREATE TABLE "post" ({column_defs}, PRIMARY KEY ("channel", "feed", "url"))')
+                    connection.executemany(f"INSERT INTO post VALUES ({', '.join('?' * len(names))})", (row[: len(names)] for row in rows))
+                    connection.commit()
+                _migrate(db_dir / filename, db_dir / config.DB_FILENAME)
+                with contextlib.closing(sqlite3.connect(db_dir / config.DB_FILENAME)) as connection:
+                    migrated_rows = connection.execute("SELECT channel, feed, url, hour FROM post ORDER BY channel, feed, url").fetchall()
+                    self.assertEqual(migrated_rows, sorted((*row[:3], row[3] if "hour" in names else _hour()) for row in rows))
+                    self.assertEqual(connection.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+                self.assertEqual(sorted(p.name for p in db_dir.iterdir()), sorted([filename, config.DB_FILENAME]))
+
+
+# python -m unittest -v ircrssfeedbot.db
@@ -0,0 +1,270 @@
+"""Export, import, and merge the posts of databases in bounded memory.
+
+The bot must not be running with a database which is written to.
+
+CLI examples:
+    python -m ircrssfeedbot.dbtool export ./posts.v4.db ./posts.bin
+    python -m ircrssfeedbot.dbtool import ./posts.bin ./new/posts.v4.db
+    python -m ircrssfeedbot.dbtool merge ./a/posts.v4.db ./b/posts.v4.db ./merged/posts.v4.db --rename-feed "##chan" OldName NewName
+"""
+import argparse
+import array
+import contextlib
+import logging
+import sqlite3
+import struct
+import sys
+import tempfile
+import unittest
+import unittest.mock
+import zlib
+from pathlib import Path
+from typing import Callable, Final, Iterable, Iterator, List, Sequence, Tuple
+
+import peewee
+
+from . import config
+from .db import Post, _hour
+from .util.hashlib import Int8Hash
+from .util.humanize import humanize_bytes
+from .util.timeit import Timer
+
+log = logging.getLogger(f"{config.PACKAGE_NAME}.dbtool")  # Note: __name__ is "__main__" when this is run as a module.
+
+Row = Tuple[int, int, int, int]  # (channel_hash, feed_hash, url_hash, hour)
+
+_FILE_MAGIC: Final = b"ircrssfeedbot posts\n"
+_FILE_VERSION: Final = struct.Struct("<I")
+_FILE_CHUNK_HEADER: Final = struct.Struct("<II")  # Number of rows and number of compressed bytes. A chunk having no rows ends the file.
+_NUM_COLUMNS: Final = 4  # Per Row.
+_SQL_INSERT: Final = "INSERT OR IGNORE INTO post (channel, feed, url, hour) VALUES (?, ?, ?, ?)"  # A row which exists is kept, including its hour.
+_VERSION: Final = 1
+
+
+def _read_db(db_path: Path) -> Iterator[List[Row]]:
+    """Yield the rows of the given database in chunks in the order of the primary key.
+
+    The database is opened read-only. For a v2 database, which has no posted hours, the current hour is used.
+    """
+    with contextlib.closing(sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)) as connection:
+        column_names = {row[1] for row in connection.execute("PRAGMA table_info(post);")}
+        if not column_names:
+            raise ValueError(f"Database {db_path} has no post table.")
+        hour = "hour" if ("hour" in column_names) else str(_hour())
+        cursor = connection.execute(f"SELECT channel, feed, url, {hour} FROM post ORDER BY channel, feed, url;")  # For v4, this is a scan of the table.
+        while rows := cursor.fetchmany(config.DB_BULK_CHUNK_SIZE):
+            yield rows
+
+
+def _read_file(file_path: Path) -> Iterator[List[Row]]:
+    """Yield the rows of the given exported file in chunks."""
+    with file_path.open("rb") as file:
+        if file.read(len(_FILE_MAGIC)) != _FILE_MAGIC:
+            raise ValueError(f"File {file_path} is not an exported posts file.")
+        if (version := _FILE_VERSION.unpack(file.read(_FILE_VERSION.size))[0]) != _VERSION:
+            raise ValueError(f"File {file_path} has version {version} which is unsupported.")
+        while True:
+            if len(header := file.read(_FILE_CHUNK_HEADER.size)) < _FILE_CHUNK_HEADER.size:
+                raise ValueError(f"File {file_path} is truncated.")
+            num_rows, num_bytes = _FILE_CHUNK_HEADER.unpack(header)
+            if not num_rows:
+                return
+            values = array.array("q", zlib.decompress(file.read(num_bytes)))  # The values are stored by column.
+            if sys.byteorder == "big":
+                values.byteswap()
+            yield list(zip(*(values[i * num_rows : (i + 1) * num_rows] for i in range(_NUM_COLUMNS))))
+
+
+def _write_file(file_path: Path, chunks: Iterable[List[Row]]) -> None:
+    """Write the given chunks of rows to the given new file.
+
+    Each chunk is stored by column and is compressed, thereby compressing the repetitive channel, feed, and hour columns.
+    """
+    with file_path.open("xb") as file:
+        file.write(_FILE_MAGIC + _FILE_VERSION.pack(_VERSION))
+        for rows in chunks:
+            values = array.array("q")
+            for column in zip(*rows):
+                values.extend(column)
+            if sys.byteorder == "big":
+                values.byteswap()
+            data = zlib.compress(values.tobytes(), 1)
+            file.write(_FILE_CHUNK_HEADER.pack(len(rows), len(data)) + data)
+        file.write(_FILE_CHUNK_HEADER.pack(0, 0))
+
+
+def _insert(db_path: Path, chunks: Iterable[List[Row]]) -> int:
+    """Insert the given chunks of rows into the given database, creating it if necessary, using one transaction per chunk.
+
+    The number of inserted rows is returned. A row which exists is not inserted.
+    """
+    db = peewee.SqliteDatabase(db_path, pragmas=config.DB_PRAGMAS)
+    with db.bind_ctx([Post]):
+        db.create_tables([Post])
+    num_inserted = 0
+    with contextlib.closing(db):
+        connection = db.connection()
+        for rows in chunks:
+            num_changes = connection.total_changes
+            with db.atomic():
+                connection.executemany(_SQL_INSERT, rows)
+            num_inserted += connection.total_changes - num_changes
+    return num_inserted
+
+
+def _renamed(chunks: Iterable[List[Row]], channel_renames: Sequence[Tuple[str, str]], feed_renames: Sequence[Tuple[str, str, str]]) -> Iterator[List[Row]]:
+    """Yield the given chunks of rows, rewriting the channel and feed hashes of the given renames.
+
+    A feed rename is of a channel name, an old feed name, and a new feed name, where the channel name is the one before any rename of the channel.
+    """
+    channel_hashes = {Int8Hash.as_int(old): Int8Hash.as_int(new) for old, new in channel_renames}
+    feed_hashes = {(Int8Hash.as_int(channel), Int8Hash.as_int(old)): Int8Hash.as_int(new) for channel, old, new in feed_renames}
+    for rows in chunks:
+        if channel_hashes or feed_hashes:
+            rows = [(channel_hashes.get(c, c), feed_hashes.get((c, f), f), u, h) for c, f, u, h in rows]
+        yield rows
+
+
+def _logged(chunks: Iterable[List[Row]], description: str, counter: List[int]) -> Iterator[List[Row]]:
+    """Yield the given chunks of rows, logging the throughput of their consumption, and counting them in the given single-item list."""
+    timer, num_rows_logged = Timer(), 0
+    for rows in chunks:
+        yield rows
+        counter[0] += len(rows)
+        if (counter[0] - num_rows_logged) >= config.DB_BULK_LOG_ROWS:
+            log.info("%s %s rows so far at %s rows/s.", description, f"{counter[0]:,}", f"{counter[0] / timer():,.0f}")
+            num_rows_logged = counter[0]
+
+
+def export_db(db_path: Path, file_path: Path, channel_renames: Sequence[Tuple[str, str]] = (), feed_renames: Sequence[Tuple[str, str, str]] = ()) -> int:
+    """Export the rows of the given database to the given new file, returning the number of rows."""
+    timer, counter = Timer(), [0]
+    log.info("Exporting database %s having size %s to file %s.", db_path, humanize_bytes(db_path.stat().st_size), file_path)
+    _write_file(file_path, _logged(_renamed(_read_db(db_path), channel_renames, feed_renames), "Exported", counter))
+    log.info(
+        "Exported %s rows to file %s having size %s in %s at %s rows/s.",
+        f"{counter[0]:,}",
+        file_path,
+        humanize_bytes(file_path.stat().st_size),
+        timer,
+        f"{counter[0] / timer():,.0f}",
+    )
+    return counter[0]
+
+
+def import_files(file_paths: Sequence[Path], db_path: Path, channel_renames: Sequence[Tuple[str, str]] = (), feed_renames: Sequence[Tuple[str, str, str]] = ()) -> int:
+    """Import the rows of the given exported files into the given database, returning the number of inserted rows."""
+    return _import(file_paths, _read_file, db_path, channel_renames, feed_renames)
+
+
+def merge_dbs(db_paths: Sequence[Path], db_path: Path, channel_renames: Sequence[Tuple[str, str]] = (), feed_renames: Sequence[Tuple[str, str, str]] = ()) -> int:
+    """Merge the rows of the given databases into the given database, returning the number of inserted rows."""
+    if db_path.resolve() in {p.resolve() for p in db_paths}:
+        raise ValueError(f"Database {db_path} is both a source and the target of the merge.")
+    return _import(db_paths, _read_db, db_path, channel_renames, feed_renames)
+
+
+def _import(
+    paths: Sequence[Path],
+    read: Callable[[Path], Iterator[List[Row]]],
+    db_path: Path,
+    channel_renames: Sequence[Tuple[str, str]],
+    feed_renames: Sequence[Tuple[str, str, str]],
+) -> int:
+    """Insert the rows read from each of the given paths into the given database, returning the number of inserted rows."""
+    num_inserted = 0
+    for path in paths:
+        timer, counter = Timer(), [0]
+        log.info("Importing %s having size %s into database %s.", path, humanize_bytes(path.stat().st_size), db_path)
+        num_path_inserted = _insert(db_path, _logged(_renamed(read(path), channel_renames, feed_renames), "Imported", counter))
+        log.info(
+            "Imported %s rows from %s into database %s in %s at %s rows/s, inserting %s rows and ignoring %s existing rows.",
+            f"{counter[0]:,}",
+            path,
+            db_path,
+            timer,
+            f"{counter[0] / timer():,.0f}",
+            f"{num_path_inserted:,}",
+            f"{counter[0] - num_path_inserted:,}",
+        )
+        num_inserted += num_path_inserted
+    log.info("Database %s has size %s.", db_path, humanize_bytes(db_path.stat().st_size))
+    return num_inserted
+
+
+def main() -> None:
+    """Run the command given by the command-line arguments."""
+    config.configure_logging()
+    renames_parser = argparse.ArgumentParser(add_help=False)
+    renames_parser.add_argument("--rename-channel", nargs=2, action="append", default=[], metavar=("OLD", "NEW"), help="Rewrite the hash of a renamed channel.")
+    renames_parser.add_argument(
+        "--rename-feed",
+        nargs=3,
+        action="append",
+        default=[],
+        metavar=("CHANNEL", "OLD", "NEW"),
+        help="Rewrite the hash of a renamed feed of a channel, using its old channel name.",
+    )
+    parser = argparse.ArgumentParser(prog=f"{config.PACKAGE_NAME}.dbtool", description="Export, import, and merge the posts of databases")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", parents=[renames_parser], help="Export a database to a new compressed binary file.")
+    export_parser.add_argument("source", type=Path, help="Database file path, e.g. /some/dir/posts.v4.db")
+    export_parser.add_argument("target", type=Path, help="New exported file path, e.g. /some/dir/posts.bin")
+    import_parser = subparsers.add_parser("import", parents=[renames_parser], help="Import exported files into a database, creating it if necessary.")
+    import_parser.add_argument("sources", type=Path, nargs="+", help="Exported file paths")
+    import_parser.add_argument("target", type=Path, help="Database file path")
+    merge_parser = subparsers.add_parser("merge", parents=[renames_parser], help="Merge databases into a database, creating it if necessary.")
+    merge_parser.add_argument("sources", type=Path, nargs="+", help="Database file paths")
+    merge_parser.add_argument("target", type=Path, help="Database file path")
+    args = parser.parse_args()
+
+    renames = {"channel_renames": args.rename_channel, "feed_renames": args.rename_feed}
+    if args.command == "export":
+        export_db(args.source, args.target, **renames)
+    elif args.command == "import":
+        import_files(args.sources, args.target, **renames)
+    else:
+        merge_dbs(args.sources, args.target, **renames)
+
+
+if __name__ == "__main__":
+    main()
+
+
+# pylint: disable=missing-class-docstring,missing-function-docstring
+class TestDbTool(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        keys = [(c, f, u) for c in (Int8Hash.MIN, 0, Int8Hash.as_int("#a")) for f in (-1, Int8Hash.as_int("f")) for u in (Int8Hash.MAX, 1, 2)]
+        self.rows = [(*key, 400_000 + i) for i, key in enumerate(keys)]
+
+    def _select_rows(self, db_path: Path) -> List[Row]:
+        return [row for rows in _read_db(db_path) for row in rows]
+
+    def test_export_import(self):
+        with unittest.mock.patch.object(config, "DB_BULK_CHUNK_SIZE", 5):
+            _insert(self.dir / "source.db", [self.rows])
+            self.assertEqual(export_db(self.dir / "source.db", self.dir / "posts.bin"), len(self.rows))
+            self.assertEqual(import_files([self.dir / "posts.bin"], self.dir / "target.db"), len(self.rows))
+            self.assertEqual(import_files([self.dir / "posts.bin"], self.dir / "target.db"), 0)
+        self.assertEqual(self._select_rows(self.dir / "target.db"), sorted(self.rows))
+        self.assertRaises(FileExistsError, export_db, self.dir / "source.db", self.dir / "posts.bin")
+        (self.dir / "truncated.bin").write_bytes((self.dir / "posts.bin").read_bytes()[:-1])
+        self.assertRaises(ValueError, import_files, [self.dir / "truncated.bin"], self.dir / "target.db")
+
+    def test_merge(self):
+        channel, feed = Int8Hash.as_int("#a"), Int8Hash.as_int("f")
+        _insert(self.dir / "a.db", [self.rows[:10]])
+        _insert(self.dir / "b.db", [[(*row[:3], row[3] + 1) for row in self.rows[5:]]])
+        with contextlib.closing(sqlite3.connect(self.dir / "posts.v2.db")) as connection:
+            connection.execute('CREATE TABLE "post" ("channel" INTEGER NOT NULL, "feed" INTEGER NOT NULL, "url" INTEGER NOT NULL, PRIMARY KEY ("channel", "feed", "url"))')
+            connection.execute("INSERT INTO post VALUES (?, ?, ?)", (channel, feed, 3))
+            connection.commit()
+        num_inserted = merge_dbs([self.dir / "a.db", self.dir / "b.db", self.dir / "posts.v2.db"], self.dir / "merged.db", feed_renames=[("#a", "f", "g")])
+        self.assertEqual(num_inserted, len(self.rows) + 1)
+        renamed_rows = {(c, Int8Hash.as_int("g") if (c, f) == (channel, feed) else f, u, h) for c, f, u, h in self.rows[:10] + [(*r[:3], r[3] + 1) for r in self.rows[10:]]}
+        self.assertEqual(set(self._select_rows(self.dir / "merged.db")), renamed_rows | {(channel, Int8Hash.as_int("g"), 3, _hour())})
+        self.assertRaises(ValueError, merge_dbs, [self.dir / "a.db"], self.dir / "a.db")
+
+
+# python -m unittest -v ircrssfeedbot.dbtool
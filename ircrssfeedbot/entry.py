@@ -1,12 +1,15 @@
 """Feed entry."""
 import dataclasses
+import itertools
 import logging
 import re
-from typing import Any, Dict, List, Optional, Pattern, Tuple
+from typing import AbstractSet, Any, ClassVar, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
 
 from . import config
 from .style import style
+from .util.datetime import timestamp
 from .util.list import ensure_list
+from .util.re import MultiPattern
 from .util.textwrap import shorten_to_bytes_width
 
 log = logging.getLogger(__name__)
@@ -20,6 +23,22 @@ class RawFeedEntry(dict):
     Its instance is used for creating an instance of `FeedEntry`.
     """
 
+    PROPERTY_KEYS: ClassVar[Dict[str, FrozenSet[str]]] = {  # Keys read by each property.
+        "title": frozenset({"title"}),
+        "link": frozenset({"link"}),
+        "summary": frozenset({"summary"}),
+        "categories": frozenset({"category"}),
+        "published_time": frozenset({"published", "updated"}),
+    }
+
+    @classmethod
+    def raw_keys(cls, fields: AbstractSet[str]) -> FrozenSet[str]:
+        """Return the raw keys needed for the given fields.
+
+        A field is either the name of a property of this class or a raw key.
+        """
+        return frozenset(k for f in fields for k in cls.PROPERTY_KEYS.get(f, (f,)))
+
     @property
     def title(self) -> str:
         """Return the entry title."""
@@ -43,6 +62,11 @@ class RawFeedEntry(dict):
         """Return a list of entry categories."""
         return [c.strip() for c in ensure_list(self.get("category"))]
 
+    @property
+    def published_time(self) -> Optional[float]:
+        """Return the entry published or else updated time as a POSIX timestamp, if it is available and parseable."""
+        return timestamp(self.get("published") or self.get("updated"))
+
 
 @dataclasses.dataclass(unsafe_hash=True)
 class FeedEntry:
@@ -59,61 +83,18 @@ class FeedEntry:
         self.short_url: Optional[str] = None
         self.matching_title_search_pattern: Optional[Pattern] = None
 
-    def _matching_pattern(self, patterns: Dict[str, List[Pattern]]) -> Optional[Tuple[str, Pattern]]:
-        """Return the matching key name and regular expression pattern, if any."""
-        # Check title and long URL
-        for search_key, val in {"title": self.title, "url": self.long_url}.items():
-            for pattern in patterns[search_key]:
-                if pattern.search(val):
-                    log.log(5, "%s matches %s pattern %s.", self, search_key, repr(pattern.pattern))
-                    return search_key, pattern
-
-        # Check categories
-        for pattern in patterns["category"]:
-            for category in self.categories:  # This loop is only for categories.
-                if pattern.search(category):
-                    log.log(5, "%s having category %s matches category pattern %s.", self, repr(category), repr(pattern.pattern))
-                    return "category", pattern
-
-        return None
-
-    @property
-    def blacklisted_pattern(self) -> Optional[Tuple[str, Pattern]]:
-        """Return the matching key name and blacklisted regular expression pattern, if any."""
-        return self._matching_pattern(self.feed_reader.blacklist)
-
-    @property
-    def whitelisted_pattern(self) -> Optional[Tuple[str, Pattern]]:
-        """Return the matching key name and whitelisted regular expression pattern, if any."""
-        return self._matching_pattern(self.feed_reader.whitelist)
-
-    def message(self, channel: Optional[str] = None) -> str:  # pylint: disable=too-many-locals
+    def message(self, channel: Optional[str] = None) -> str:
         """Return the message to post."""
-        # Obtain feed config
-        feed_config = self.feed_reader.config
-        native_channel = self.feed_reader.channel
-        channel = channel or native_channel
-        explain = (feed_config.get("whitelist") or {}).get("explain")
-        msg_config = feed_config.get("message") or {}
-        include_summary = msg_config.get("summary") and self.summary
-        style_config = feed_config.get("style") or {}
+        template: MessageTemplate = self.feed_reader.message_template(channel or self.feed_reader.channel)
+        include_summary = template.summary and self.summary
 
         def _style_title(text: str, **kwargs: Any) -> str:
-            return style(text, styler="irc" if style_config else "unicode", **kwargs)
-
-        # Define post params
-        format_map = dict(
-            identity=config.runtime.identity,
-            channel=channel,
-            styled_native_channel=style(native_channel, styler="irc", fg="silver"),  # Note: silver color may be unclear for some clients.
-            styled_feed=style(self.feed_reader.name, styler="irc", **style_config.get("name", {})),
-            url=self.short_url or self.long_url,
-        )
+            return style(text, styler=template.styler, **kwargs)
 
         # Define post caption
-        format_map["caption"] = ""
-        if msg_config.get("title", True) and (title := self.title):
-            if explain and (pattern := self.matching_title_search_pattern) and (match := pattern.search(title)):  # pylint: disable=used-before-assignment
+        caption = ""
+        if template.title and (title := self.title):
+            if template.explain and (pattern := self.matching_title_search_pattern) and (match := pattern.search(title)):  # pylint: disable=used-before-assignment
                 # Note: A match is not always guaranteed to exist due to sub, format, etc.
                 span0, span1 = match.span()
                 title_pre, title_mid, title_post = title[:span0], title[span0:span1], title[span1:]
@@ -126,27 +107,13 @@ class FeedEntry:
                     title = title_pre + _style_title(title_mid, italics=True) + title_post
             elif include_summary:
                 title = _style_title(title, bold=True)
-            format_map["caption"] += title
+            caption += title
         if include_summary:
-            if format_map["caption"]:
-                format_map["caption"] += ": "
-            format_map["caption"] += self.summary
-
-        # Define message format
-        msg_format = "" if (channel == native_channel) else "<{styled_native_channel}> "
-        msg_format += "[{styled_feed}]"
-        if format_map["caption"]:
-            msg_format += " {caption} →"
-        msg_format += " {url}"
-        privmsg_format = f":{{identity}} PRIVMSG {{channel}} :{msg_format}"
-
-        # Shorten caption
-        base_bytes_use = len(privmsg_format.format_map({**format_map, "caption": ""}).encode())
-        caption_bytes_width = max(0, config.QUOTE_LEN_MAX - base_bytes_use)
-        format_map["caption"] = shorten_to_bytes_width(format_map["caption"], caption_bytes_width)
-
-        msg = msg_format.format_map(format_map)
-        return msg
+            if caption:
+                caption += ": "
+            caption += self.summary
+
+        return template.render(caption, self.short_url or self.long_url)
 
     def topic(self, topic: str) -> str:
         """Return the updated or unchanged channel topic as updated by the entry."""
@@ -158,3 +125,127 @@ class FeedEntry:
                 topic_parts[key] = self.short_url or self.feed_reader.url_shortener.shorten_urls([self.long_url])[self.long_url]
         topic = " | ".join((f"{k}: {v}" if v else k) for k, v in topic_parts.items())
         return topic
+
+
+@dataclasses.dataclass(frozen=True)
+class MessageTemplate:
+    """Precompiled message format of the entries of a feed for a target channel.
+
+    The styled names and the byte overhead of the message are computed once, leaving only the caption and URL to be rendered per entry.
+    """
+
+    identity: str
+    prefix: str
+    caption_bytes_width: int  # This excludes the bytes of the URL.
+    title: bool
+    summary: bool
+    explain: bool
+    styler: str
+
+    @classmethod
+    def from_config(cls, feed_config: Dict, feed_name: str, native_channel: str, channel: str) -> "MessageTemplate":
+        """Return the message template for the given feed config and target channel."""
+        msg_config = feed_config.get("message") or {}
+        style_config = feed_config.get("style") or {}
+        prefix = "" if (channel == native_channel) else f"<{style(native_channel, styler='irc', fg='silver')}> "  # Note: silver color may be unclear for some clients.
+        prefix += f"[{style(feed_name, styler='irc', **style_config.get('name', {}))}]"
+        identity = config.runtime.identity
+        return cls(
+            identity=identity,
+            prefix=prefix,
+            caption_bytes_width=config.QUOTE_LEN_MAX - len(f":{identity} PRIVMSG {channel} :{prefix}  → ".encode()),
+            title=bool(msg_config.get("title", True)),
+            summary=bool(msg_config.get("summary")),
+            explain=bool((feed_config.get("whitelist") or {}).get("explain")),
+            styler="irc" if style_config else "unicode",
+        )
+
+    def render(self, caption: str, url: str) -> str:
+        """Return the message having the given caption, shortened as necessary, and URL."""
+        if not caption:
+            return f"{self.prefix} {url}"
+        caption = shorten_to_bytes_width(caption, max(0, self.caption_bytes_width - len(url.encode())))
+        return f"{self.prefix} {caption} → {url}"
+
+
+@dataclasses.dataclass
+class EntryBatch:
+    """Columnar batch of feed entries.
+
+    Each field is a column having a value per entry, thereby permitting an entry processing stage to be applied to a column at once.
+    An instance is intended to be safe for pickling for use with multiprocessing.
+
+    It is materialized into instances of `FeedEntry` only for the entries which remain after processing.
+    """
+
+    title: List[str]
+    long_url: List[str]
+    summary: List[str]
+    categories: List[List[str]]
+    data: List[Dict[str, Any]]
+    published_time: List[Optional[float]]  # Is not materialized.
+    matching_title_search_pattern: List[Optional[Pattern]]
+
+    def __len__(self) -> int:
+        return len(self.long_url)
+
+    @classmethod
+    def from_raw_entries(cls, entries: List[RawFeedEntry]) -> "EntryBatch":
+        """Return the batch of the given raw entries."""
+        return cls(
+            title=[e.title for e in entries],
+            long_url=[e.link for e in entries],
+            summary=[e.summary for e in entries],
+            categories=[e.categories for e in entries],
+            data=[dict(e) for e in entries],
+            published_time=[e.published_time for e in entries],
+            matching_title_search_pattern=[None] * len(entries),
+        )
+
+    @classmethod
+    def concat(cls, batches: List["EntryBatch"]) -> "EntryBatch":
+        """Return the batch of the entries of the given batches in order."""
+        return cls(**{f.name: [v for b in batches for v in getattr(b, f.name)] for f in dataclasses.fields(cls)})
+
+    def select(self, indexes: Iterable[int]) -> "EntryBatch":
+        """Return the batch of the entries at the given indexes."""
+        indexes = list(indexes)
+        return self.__class__(**{name: [column[i] for i in indexes] for name, column in vars(self).items()})
+
+    def compress(self, selectors: Iterable[bool]) -> "EntryBatch":
+        """Return the batch of the entries for which the corresponding selector is true."""
+        selectors = list(selectors)
+        return self.__class__(**{name: list(itertools.compress(column, selectors)) for name, column in vars(self).items()})
+
+    def matching_patterns(self, patterns: Dict[str, MultiPattern]) -> List[Optional[Tuple[str, Pattern]]]:
+        """Return the matching key name and regular expression pattern, if any, of each entry."""
+        matches: List[Optional[Tuple[str, Pattern]]] = [None] * len(self)
+
+        # Check title and long URL
+        for search_key, column in {"title": self.title, "url": self.long_url}.items():
+            if not (multi_pattern := patterns[search_key]):
+                continue
+            for index, val in enumerate(column):
+                if (matches[index] is None) and (pattern := multi_pattern.search(val)):
+                    log.log(5, "Entry %s matches %s pattern %s.", self.long_url[index], search_key, repr(pattern.pattern))
+                    matches[index] = search_key, pattern
+
+        # Check categories
+        if multi_pattern := patterns["category"]:
+            for index, categories in enumerate(self.categories):
+                if (matches[index] is None) and (pattern := multi_pattern.search(*categories)):
+                    log.log(5, "Entry %s having categories %s matches category pattern %s.", self.long_url[index], categories, repr(pattern.pattern))
+                    matches[index] = "category", pattern
+
+        return matches
+
+    def to_entries(self, feed_reader: Any) -> List[FeedEntry]:
+        """Return the entries of the batch."""
+        entries = []
+        for title, long_url, summary, categories, data, matching_title_search_pattern in zip(
+            self.title, self.long_url, self.summary, self.categories, self.data, self.matching_title_search_pattern
+        ):
+            entry = FeedEntry(title=title, long_url=long_url, summary=summary, categories=categories, data=data, feed_reader=feed_reader)
+            entry.matching_title_search_pattern = matching_title_search_pattern
+            entries.append(entry)
+        return entries
@@ -1,58 +1,255 @@
 """Feed reader and feed."""
+import array
+import bisect
 import collections
 import concurrent.futures
 import dataclasses
+import hashlib
 import logging
 import multiprocessing as mp
 import multiprocessing.pool
 import re
+import string
+import threading
 import time
-import types
+import unittest
 from functools import cached_property, lru_cache
-from typing import Callable, Dict, List, Optional, Pattern, Tuple
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Tuple, Union, cast
 
+import cachetools
 import dagdshort
-import emoji
 import miniirc
 from ordered_set import OrderedSet
 
 from . import config
 from .db import Database
-from .entry import FeedEntry, RawFeedEntry
+from .entry import EntryBatch, FeedEntry, MessageTemplate, RawFeedEntry
+from .pipeline import Pipeline, PipelineMemo
 from .url import URLReader
-from .util.bs4 import html_to_text
 from .util.dict import dict_str
+from .util.hashlib import Int8Hash
 from .util.list import ensure_list
-from .util.requests import find_redirect
+from .util.re import MultiPattern
 from .util.set import leaves
 from .util.str import readable_list
-from .util.textwrap import shorten_to_bytes_width
 from .util.time import Throttle
 from .util.timeit import Timer
 
+if TYPE_CHECKING:
+    from .parsers import ParseResult, ParseSpec  # Note: The parsers are otherwise imported only by the worker processes.
+
 log = logging.getLogger(__name__)
+_SHARED_PARSE_RESULTS = cachetools.TTLCache(maxsize=config.CACHE_MAXSIZE__SHARED_PARSE, ttl=config.CACHE_TTL__SHARED_PARSE)
+_SHARED_PARSE_RESULTS_LOCK = threading.Lock()
+
+
+@dataclasses.dataclass(frozen=True)
+class IncrementalFilter:
+    """Filter out the already posted tail of the raw entries of a feed URL.
+
+    An instance is intended to be safe for pickling for use with multiprocessing.
+    It is applicable only if the final URL of an entry is computable without a network request.
+    """
+
+    posted_hashes: array.array  # Sorted array of signed 8 byte integer URL hashes.
+    max_consecutive_posted: int
+    reverse: bool
+    https: bool
+    www: bool
+    url_sub: Optional[Dict[str, str]]
+
+    def _url(self, entry: RawFeedEntry) -> str:
+        """Return the URL of the entry as it would be after its processing by the feed reader."""
+        url = entry.link
+        if self.https and url.startswith("http://"):
+            url = url.replace("http://", "https://", 1)
+        if not self.www:
+            for protocol in ("https", "http"):
+                prefix = f"{protocol}://www."
+                if url.startswith(prefix):
+                    url = url.replace(prefix, prefix[:-4], 1)
+        if self.url_sub and url:
+            url = re.sub(self.url_sub["pattern"], self.url_sub["repl"], url)
+        return url.strip().replace(" ", "%20")
+
+    def _is_posted(self, url: str) -> bool:
+        posted_hashes = self.posted_hashes
+        url_hash = Int8Hash.as_uncached_int(url)
+        index = bisect.bisect_left(posted_hashes, url_hash)
+        return (index < len(posted_hashes)) and (posted_hashes[index] == url_hash)
+
+    def __call__(self, entries: List[RawFeedEntry]) -> List[RawFeedEntry]:
+        """Return the entries preceding the first run of consecutive posted entries of the maximum length."""
+        ordered_entries = entries[::-1] if self.reverse else entries
+        num_consecutive_posted = 0
+        for index, entry in enumerate(ordered_entries):
+            if not self._is_posted(self._url(entry)):
+                num_consecutive_posted = 0
+                continue
+            num_consecutive_posted += 1
+            if num_consecutive_posted == self.max_consecutive_posted:
+                ordered_entries = ordered_entries[: index + 1 - num_consecutive_posted]
+                return ordered_entries[::-1] if self.reverse else ordered_entries
+        return entries
+
+
+@dataclasses.dataclass(frozen=True)
+class EntryNormalizer:
+    """Normalize the raw entries of a feed using its entry processing pipeline.
+
+    An instance is intended to be safe for pickling for use with multiprocessing.
+    It is applicable only if the pipeline has no I/O stages, i.e. if `redirect` is not used.
+    """
+
+    feed_desc: str
+    feed_config: Dict
+    consumed_fields: FrozenSet[str]
+    blacklist: Dict[str, MultiPattern]
+    whitelist: Dict[str, MultiPattern]
 
+    def __str__(self):
+        return self.feed_desc
+
+    def __call__(self, entries: List[RawFeedEntry], min_published_time: Optional[float] = None) -> Tuple[EntryBatch, int, Dict[str, int]]:
+        """Return the batch of normalized entries along with the number of removed old entries and the number of otherwise removed entries by stage name."""
+        pipeline = Pipeline.from_config(self.feed_config, self.blacklist, self.whitelist).prune(self.consumed_fields)
+        batch, num_old = _remove_old_entries(EntryBatch.from_raw_entries(entries), min_published_time)
+        batch, num_removed = pipeline(batch)
+        return batch, num_old, dict(num_removed)
+
+
+def _remove_old_entries(batch: EntryBatch, min_published_time: Optional[float]) -> Tuple[EntryBatch, int]:
+    """Return the batch without the entries published before the given time, along with their number.
+
+    Entries without a known published time are kept.
+    """
+    if (min_published_time is None) or (not batch):
+        return batch, 0
+    keep = [(t is None) or (t >= min_published_time) for t in batch.published_time]
+    num_old = keep.count(False)
+    return (batch.compress(keep) if num_old else batch), num_old
 
-def _parse_entries(parser_name: str, selector: Optional[str], follower: Optional[str], url_content: bytes) -> Tuple[List[RawFeedEntry], List[str]]:
-    from . import parsers  # pylint: disable=import-outside-toplevel
 
-    Parser = getattr(parsers, parser_name).Parser  # pylint: disable=invalid-name
-    parser = Parser(selector=selector, follower=follower, content=url_content)
+def _parse_entries(
+    url_content: bytes, specs: List["ParseSpec"], incremental_filter: Optional[IncrementalFilter] = None
+) -> List[Union[Tuple[List[RawFeedEntry], List[str], int], Exception]]:
+    from .parsers import parse_batch  # pylint: disable=import-outside-toplevel
+
+    results: List[Union[Tuple[List[RawFeedEntry], List[str], int], Exception]] = []
+    for result in parse_batch(url_content, specs):
+        try:
+            if isinstance(result, Exception):
+                raise result
+            entries, urls = result
+            num_entries = len(entries)
+            if incremental_filter:
+                entries = incremental_filter(entries)
+            results.append((entries, urls, num_entries - len(entries)))
+        except Exception as exception:  # pylint: disable=broad-except
+            results.append(ChildProcessError(f"{exception.__class__.__module__}.{exception.__class__.__qualname__}: {exception}"))
+            # Note: This prevents possible pickle error of original exception.
+    return results
+
+
+def _parse_and_normalize_entries(
+    url_content: bytes, spec: "ParseSpec", incremental_filter: Optional[IncrementalFilter], min_published_time: Optional[float], entry_normalizer: EntryNormalizer
+) -> Union[Tuple[EntryBatch, List[str], int, int, Dict[str, int]], Exception]:
+    result = _parse_entries(url_content, [spec], incremental_filter)[0]
+    if isinstance(result, Exception):
+        return result
+    entries, urls, num_skipped = result
     try:
-        return parser.entries, parser.urls  # pylint: disable=no-member
-    except Exception as exception:
-        raise ChildProcessError(f"{exception.__class__.__module__}.{exception.__class__.__qualname__}: {exception}")  # pylint: disable=raise-missing-from
-        # Note: This prevents possible pickle error of original exception.
+        normalized_entries, num_old, num_removed = entry_normalizer(entries, min_published_time)
+    except Exception as exception:  # pylint: disable=broad-except
+        return ChildProcessError(f"{exception.__class__.__module__}.{exception.__class__.__qualname__}: {exception}")
+    return normalized_entries, urls, num_skipped, num_old, num_removed
+
+
+def _entry_fields(feed_config: Dict, feed_desc: str) -> Optional[FrozenSet[str]]:
+    """Return the names of the raw entry properties and additional raw entry keys used by the given feed config.
+
+    None is returned if this cannot be determined, in which case all raw entry keys are to be used.
+    """
+    fields = {"title", "link"}  # These are always used.
+    if (feed_config.get("message") or {}).get("summary"):
+        fields.add("summary")
+    if any(leaves((feed_config.get(list_type) or {}).get("category")) for list_type in ("blacklist", "whitelist")):
+        fields.add("categories")
+    if _max_age(feed_config) is not None:
+        fields.add("published_time")
+    if format_config := feed_config.get("format"):
+        # Note: The format params are documented as having all raw entry keys along with the default additions.
+        format_params = set(format_config.get("re") or {})
+        for format_str in (format_config.get("str") or {}).values():
+            try:
+                format_params.update(re.split(r"[.\[]", name, maxsplit=1)[0] for _, name, _, _ in string.Formatter().parse(format_str) if name)
+            except ValueError:
+                log.warning(f"Unable to parse the format string {format_str!r} of {feed_desc}. All raw entry keys will be used for it.")
+                return None
+        format_params_to_fields = {"url": "link", "feed": None}  # Other params, e.g. title, summary, categories, are unchanged.
+        fields.update(f for p in format_params if (f := format_params_to_fields.get(p, p)))
+    return frozenset(fields)
+
+
+def _max_age(feed_config: Dict) -> Union[None, bool, float]:
+    """Return the effective `max_age` of the given feed config, which is None if it is disabled or is not a positive number."""
+    max_age = feed_config.get("max_age")
+    if isinstance(max_age, bool):
+        return max_age or None
+    if isinstance(max_age, (int, float)) and (max_age > 0):
+        return max_age
+    return None
+
+
+def _consumed_fields(feed_config: Dict) -> FrozenSet[str]:
+    """Return the names of the entry fields which are used after processing the entries of the given feed config.
+
+    These fields are used by the message, topic, and publishers.
+    """
+    fields = {"title", "long_url"}  # These are always used.
+    if (feed_config.get("message") or {}).get("summary"):
+        fields.add("summary")
+    if (feed_config.get("whitelist") or {}).get("explain"):
+        fields.add("matching_title_search_pattern")
+    return frozenset(fields)
+
+
+def _parser_config(feed_config: Dict) -> Tuple[str, Optional[str], Optional[str]]:
+    """Return the parser name, selector, and follower for the given feed config."""
+    for parser_name in ("css", "hext", "jmes", "jmespath", "pandas", "xpath"):  # Searched in alphabetical order.
+        if parser_config := feed_config.get(parser_name):
+            if parser_name == "jmes":  # Deprecated name.
+                parser_name = "jmespath"
+
+            if isinstance(parser_config, str):
+                parser_config = {"select": parser_config, "follow": None}
+            return parser_name, parser_config["select"], parser_config.get("follow")
+    return "feedparser", None, None
+
+
+@lru_cache(maxsize=1)
+def _shared_url_parse_specs() -> Dict[str, List["ParseSpec"]]:
+    """Return a mapping of each URL which is configured for multiple feeds having unique parse specs to those specs."""
+    specs_by_url: Dict[str, Dict["ParseSpec", None]] = collections.defaultdict(dict)  # Uses dict as an ordered set.
+    for channel, channel_config in config.INSTANCE["feeds"].items():
+        for feed, feed_config in channel_config.items():
+            feed_config = {**config.INSTANCE["defaults"], **feed_config}
+            spec = (*_parser_config(feed_config), _entry_fields(feed_config, f"feed {feed} of {channel}"))
+            for url in ensure_list(feed_config["url"]):
+                specs_by_url[url][spec] = None
+    shared_url_parse_specs = {url: list(specs) for url, specs in specs_by_url.items() if len(specs) > 1}
+    log.debug(f"There are {len(shared_url_parse_specs)} URLs which are shared by feeds having unique parse specs.")
+    return shared_url_parse_specs
 
 
 @lru_cache(maxsize=None)  # maxsize is bounded by a multiple of the number of feeds.
-def _patterns(channel: str, feed: str, list_type: str) -> Dict[str, List[Pattern]]:  # Cache-lookup friendly signature.
-    """Return a mapping of keys to a list of unique compiled regular expression patterns for the given args.
+def _patterns(channel: str, feed: str, list_type: str) -> Dict[str, MultiPattern]:  # Cache-lookup friendly signature.
+    """Return a mapping of keys to the combined unique regular expression patterns for the given args.
 
     The mapping keys are `title`, `url`, and `category`.
     """
     list_config = config.INSTANCE["feeds"][channel][feed].get(list_type) or {}
-    patterns = {key: [re.compile(pat) for pat in leaves(list_config.get(key))] for key in ("title", "url", "category")}
+    patterns = {key: MultiPattern(leaves(list_config.get(key))) for key in ("title", "url", "category")}
     log.debug("Caching regex patterns for %s of feed %s of %s.", list_type, feed, channel)
     return patterns
 
@@ -80,20 +277,46 @@ class FeedReader:
         self.mirror = self.config.get("mirror") in (None, True)
 
         # Configure parser
-        for parser_name in ("hext", "jmes", "jmespath", "pandas"):  # Searched in alphabetical order.
-            if parser_config := self.config.get(parser_name):
-                if parser_name == "jmes":  # Deprecated name.
-                    parser_name = "jmespath"
-
-                if isinstance(parser_config, str):
-                    parser_config = {"select": parser_config, "follow": None}
-                parser_selector, parser_follower = parser_config["select"], parser_config.get("follow")
-
-                break
+        self.parser_name, self.parser_selector, self.parser_follower = _parser_config(self.config)
+
+        # Configure incremental parsing
+        incremental = self.config.get("incremental")
+        self.incremental_max_consecutive_posted: int = config.INCREMENTAL_CONSECUTIVE_POSTED_DEFAULT if (incremental is True) else (incremental or 0)
+        if self.incremental_max_consecutive_posted and (self.config.get("redirect") or ((self.config.get("format") or {}).get("str") or {}).get("url")):
+            log.warning(f"Incremental parsing is disabled for {self} because its entry URLs are not known to the parser due to the use of `redirect` or `format.str.url`.")
+            self.incremental_max_consecutive_posted = 0
+
+        # Configure age-based entry cutoff
+        self.max_age = _max_age(self.config)  # In hours.
+        if (self.max_age is None) and (self.config.get("max_age") not in (None, False)):
+            log.warning(f"Removal of entries by their age is disabled for {self} because its `max_age` of {self.config['max_age']!r} is not a positive number.")
+        self.oldest_posted_published_time: Optional[float] = None  # This is used as the cutoff if `max_age` is true.
+        self.has_removed_by_max_age = False  # The first removal is logged at a higher level.
+
+        # Configure used entry fields
+        self.entry_fields = _entry_fields(self.config, str(self))
+        if self.entry_fields is not None:
+            log.debug(f"The used entry fields for {self} are: {', '.join(sorted(self.entry_fields))}")
+
+        # Compile entry processing pipeline
+        self.consumed_fields = _consumed_fields(self.config)
+        self.pipeline = Pipeline.from_config(self.config, self.blacklist, self.whitelist).prune(self.consumed_fields)  # This skips processing the fields which are not used.
+        self.entry_normalizer: Optional[EntryNormalizer] = None
+        if self.config.get("offload"):
+            if self.config.get("redirect"):
+                log.warning(f"Offloading of entry processing is disabled for {self} because `redirect` requires network requests.")
+            else:
+                self.entry_normalizer = EntryNormalizer(str(self), self.config, self.consumed_fields, self.blacklist, self.whitelist)
+        if self.entry_normalizer:
+            self.url_pipeline = self.text_pipeline = Pipeline(())  # The entries are processed by the entry normalizer instead.
+            log.debug(f"The entry processing pipeline for {self} is offloaded to the worker processes: {self.pipeline or None}")
         else:
-            parser_name = "feedparser"
-            parser_selector, parser_follower = None, None
-        self.parser_name, self.parser_selector, self.parser_follower = parser_name, parser_selector, parser_follower
+            self.url_pipeline, self.text_pipeline = self.pipeline.split({"long_url"})  # The text pipeline is run only for unposted entries.
+            log.debug(f"The entry processing pipeline for {self} is split into a URL pipeline: {self.url_pipeline or None}, and a text pipeline: {self.text_pipeline or None}")
+        config_fingerprint = repr(self.config)  # The memos are specific to the config.
+        self.url_pipeline_memo, self.text_pipeline_memo = PipelineMemo(config_fingerprint), PipelineMemo(config_fingerprint)  # Unchanged entries skip reprocessing across reads.
+
+        self.message_templates: Dict[str, MessageTemplate] = {}  # Keyed by target channel.
 
         log.debug(f"Initialized {self} having {len(self.urls)} configured URLs.")
 
@@ -111,180 +334,177 @@ class FeedReader:
         log.debug("%s %s duplicate entry URLs out of %s, leaving %s, for %s.", action, num_removed, len(entries), len(entries_deduped), self)
         return entries_deduped
 
-    def _process_entries(self, entries: List[FeedEntry]) -> List[FeedEntry]:  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
-        feed_config = self.config
+    def _process_entries(self, entries: EntryBatch) -> Tuple[List[FeedEntry], int]:
+        """Return the processed unposted entries along with the number of unique posted entries.
 
+        The posted entries skip the text pipeline, and only the processed unposted entries are materialized from the batch.
+        """
         # Reorder
-        if feed_config.get("order") == "reverse":
+        if self.config.get("order") == "reverse":
             log.debug("Reversing the order of the %s entries for %s.", len(entries), self)
-            entries = entries[::-1]
-            log.debug("Reversed the order of the %s entries for %s.", len(entries), self)
-
-        # Map redirects
-        if feed_config.get("redirect"):
-            log.debug("Redirecting %s URLs in %s.", len(entries), self)
-            for entry in entries:
-                entry.long_url = find_redirect(entry.long_url)
-            log.debug("Redirected URLs in %s.", self)
-
-        # Remove blacklisted entries
-        if feed_config.get("blacklist", {}):
-            log.debug("Filtering %s entries using blacklist for %s.", len(entries), self)
-            entries = [entry for entry in entries if not entry.blacklisted_pattern]
-            log.debug("Filtered to %s entries using blacklist for %s.", len(entries), self)
-            if not entries:
-                return entries
-
-        # Keep only whitelisted entries
-        if feed_config.get("whitelist", {}):
-            log.debug("Filtering %s entries using whitelist for %s.", len(entries), self)
-            whitelisted_entries: List[FeedEntry] = []
-            for entry in entries:
-                if key_pattern_tuple := entry.whitelisted_pattern:
-                    key, pattern = key_pattern_tuple
-                    if key == "title":
-                        entry.matching_title_search_pattern = pattern
-                    whitelisted_entries.append(entry)
-            entries = whitelisted_entries
-            log.debug("Filtered to %s entries using whitelist for %s.", len(entries), self)
-            if not entries:
-                return entries
-
-        # Enforce HTTPS for URLs
-        if feed_config.get("https"):
-            log.debug("Enforcing HTTPS for URLs in %s.", self)
-            for entry in entries:
-                if entry.long_url.startswith("http://"):
-                    entry.long_url = entry.long_url.replace("http://", "https://", 1)
-            log.debug("Enforced HTTPS for URLs in %s.", self)
-
-        # Remove WWW from URLs
-        if feed_config.get("www") is False:
-            log.debug("Removing WWW from URLs in %s.", self)
-            for entry in entries:
-                for protocol in ("https", "http"):
-                    prefix = f"{protocol}://www."
-                    if entry.long_url.startswith(prefix):
-                        entry.long_url = entry.long_url.replace(prefix, prefix[:-4], 1)
-            log.debug("Removed WWW from URLs in %s.", self)
-
-        # Remove emojis from title
-        if feed_config.get("emoji") is False:
-            log.debug("Removing emojis for titles in %s.", self)
-            for entry in entries:
-                entry.title = emoji.replace_emoji(entry.title, "")
-            log.debug("Removed emojis for titles in %s.", self)
-
-        # Substitute entries
-        if sub_config := feed_config.get("sub"):
-            log.debug("Substituting entries for %s.", self)
-            re_sub: Callable[[Dict[str, str], str], str] = lambda r, v: re.sub(r["pattern"], r["repl"], v)
-            for sub_attr, entry_attr in {"title": "title", "url": "long_url", "summary": "summary"}.items():
-                if sub_attr_config := sub_config.get(sub_attr):
-                    for entry in entries:
-                        if entry_attr_val_old := getattr(entry, entry_attr):
-                            entry_attr_val_new = re_sub(sub_attr_config, entry_attr_val_old)
-                            setattr(entry, entry_attr, entry_attr_val_new)
-            log.debug("Substituted entries for %s.", self)
-
-        # Format entries
-        if format_config := feed_config.get("format"):
-            log.debug("Formatting entries for %s.", self)
-            format_re = format_config.get("re") or {}
-            format_str = format_config.get("str") or {}
-            feed_params = types.SimpleNamespace(url=feed_config["url"])
-            for entry in entries:
-                # Collect:
-                params = {
-                    **entry.data,
-                    "title": entry.title,
-                    "url": entry.long_url,
-                    "summary": entry.summary,
-                    "categories": entry.categories,
-                    "feed": feed_params,
-                }
-                for re_key, re_val in format_re.items():
-                    if match := re.search(re_val, params[re_key]):  # type: ignore
-                        params.update(match.groupdict())
-                # Format title:
-                title_format_str = format_str.get("title", "{title}")
-                try:
-                    entry.title = title_format_str.format_map(params)
-                except Exception as exc:  # pylint: disable=broad-except
-                    log.warning(f"Unable to format entry title for {entry} by {self} due to exception {exc!r} using format string {title_format_str!r}.")
-                # Format URL:
-                url_format_str = format_str.get("url", "{url}")
-                try:
-                    entry.long_url = url_format_str.format_map(params)
-                except Exception as exc:  # pylint: disable=broad-except
-                    log.warning(f"Unable to format entry URL for {entry} by {self} due to exception {exc!r} using format string {url_format_str!r}.")
-            log.debug("Formatted entries for %s.", self)
-
-        # Escape spaces in URLs
-        log.debug("Escaping spaces in URLs for %s.", self)
-        for entry in entries:
-            # e.g. for https://covid-api.com/api/reports?iso=USA&region_province=New York&date=2020-03-15
-            entry.long_url = entry.long_url.strip().replace(" ", "%20")
-        log.debug("Escaped spaces in URLs for %s.", self)
-
-        # Strip HTML tags from titles and summaries
-        log.debug("Stripping HTML tags from titles and summaries for %s.", self)
-        for entry in entries:
-            # e.g. for http://rss.sciencedirect.com/publication/science/08999007  (Elsevier Nutrition journal)
-            entry.title = html_to_text(entry.title)
-            entry.summary = html_to_text(entry.summary)
-        log.debug("Stripped HTML tags from titles and summaries for %s.", self)
-
-        # Strip unicode quotes around titles
-        quote_begin, quote_end = tuple("“”")
-        # e.g. for https://www.sciencedirect.com/science/article/abs/pii/S0899900718307883
-        log.debug("Stripping unicode quotes around titles for %s.", self)
-        for entry in entries:
-            title = entry.title
-            if (len(title) > 2) and (title[0] == quote_begin) and (title[-1] == quote_end):
-                title = title[1:-1]
-                if (quote_begin not in title) and (quote_end not in title):
-                    entry.title = title
-        log.debug("Stripped unicode quotes around titles for %s.", self)
-
-        # Remove trailing periods from title
-        log.debug("Removing trailing periods from single-sentence titles for %s.", self)
-        for entry in entries:
-            if len(entry.title.rstrip().split(". ", maxsplit=1)) < 2:  # Crude check.
-                entry.title = entry.title.rstrip().rstrip(".")  # e.g. for PubMed RSS feeds
-        log.debug("Removed trailing periods from single-sentence titles for %s.", self)
-
-        # Replace all-caps titles
-        log.debug("Capitalizing all-caps multi-word titles for %s.", self)
-        for entry in entries:
-            entry_has_multiple_words = len(entry.title.split(maxsplit=1)) > 1
-            if entry_has_multiple_words and entry.title.isupper():  # e.g. for https://redd.it/fm8z83
-                entry.title = entry.title.capitalize()
-        log.debug("Capitalized all-caps multi-word titles for %s.", self)
-
-        # Shorten titles
-        title_max_bytes = config.TITLE_MAX_BYTES
-        log.debug("Shortening titles to %s bytes for %s.", title_max_bytes, self)
-        for entry in entries:
-            entry.title = shorten_to_bytes_width(entry.title, title_max_bytes)
-        log.debug("Shortened titles to %s bytes for %s.", title_max_bytes, self)
-
-        # Deduplicate entries
-        entries = self._dedupe_entries(entries)
+            entries = entries.select(range(len(entries) - 1, -1, -1))
+
+        # Process URLs
+        log.debug("Processing URLs of %s entries for %s using pipeline: %s", len(entries), self, self.url_pipeline)
+        num_entries, num_memo_hits = len(entries), self.url_pipeline_memo.hits
+        entries, num_removed = self.url_pipeline(entries, self.url_pipeline_memo)
+        log.debug("Processed URLs of %s entries to %s for %s, having removed %s.", num_entries, len(entries), self, dict_str(num_removed) if num_removed else 0)
+        if self.url_pipeline:
+            log.debug(
+                "The URL pipeline memo for %s had %s hits for %s entries, and has had %s.", self, self.url_pipeline_memo.hits - num_memo_hits, num_entries, self.url_pipeline_memo
+            )
 
-        return entries
+        # Remove posted entries
+        num_posted = 0
+        if entries and (self.db is not None):  # The database is unavailable in some scripts.
+            unposted_long_urls = set(self.select_unposted_long_urls(entries.long_url))
+            posted_long_urls = set(entries.long_url) - unposted_long_urls
+            num_posted = len(posted_long_urls)
+            self.db.protect_listed_posted(self.channel, self.name, posted_long_urls)
+            posted_published_times = [t for long_url, t in zip(entries.long_url, entries.published_time) if (t is not None) and (long_url not in unposted_long_urls)]
+            if posted_published_times:
+                self.oldest_posted_published_time = min(posted_published_times)
+            entries = entries.compress(long_url in unposted_long_urls for long_url in entries.long_url)
+            log.debug("Removed %s unique posted entry URLs for %s, leaving %s entries.", num_posted, self, len(entries))
+
+        # Process text
+        log.debug("Processing text of %s entries for %s using pipeline: %s", len(entries), self, self.text_pipeline)
+        num_entries, num_memo_hits = len(entries), self.text_pipeline_memo.hits
+        entries, num_removed = self.text_pipeline(entries, self.text_pipeline_memo)
+        log.debug("Processed text of %s entries to %s for %s, having removed %s.", num_entries, len(entries), self, dict_str(num_removed) if num_removed else 0)
+        if self.text_pipeline:
+            log.debug(
+                "The text pipeline memo for %s had %s hits for %s entries, and has had %s.",
+                self,
+                self.text_pipeline_memo.hits - num_memo_hits,
+                num_entries,
+                self.text_pipeline_memo,
+            )
 
-    def _parse_entries(self, url_content: bytes) -> Tuple[List[FeedEntry], List[str]]:
+        # Materialize and deduplicate entries
+        return self._dedupe_entries(entries.to_entries(self)), num_posted
+
+    def message_template(self, channel: str) -> MessageTemplate:
+        """Return the precompiled message template of the entries of the feed for the given target channel."""
+        template = self.message_templates.get(channel)
+        if (template is None) or (template.identity != config.runtime.identity):  # The identity can change upon reconnecting.
+            template = self.message_templates[channel] = MessageTemplate.from_config(self.config, self.name, self.channel, channel)
+            log.debug(f"Compiled the message template of {self} for {channel}: {template}")
+        return template
+
+    def _min_published_time(self) -> Optional[float]:
+        """Return the POSIX timestamp before which published entries are to be removed right after parsing, if any."""
+        if self.max_age is None:
+            return None
+        if self.max_age is True:  # This is unsafe for a feed which is not chronological, and so it is not the default.
+            return self.oldest_posted_published_time
+        return time.time() - self.max_age * 3600
+
+    def _incremental_filter(self) -> Optional[IncrementalFilter]:
+        """Return the filter for incremental parsing if it is enabled and applicable."""
+        if not self.incremental_max_consecutive_posted:
+            return None
+        posted_hashes = self.db.select_recently_posted_hashes(self.channel, self.name, config.INCREMENTAL_POSTED_HASHES_MAX)
+        if not posted_hashes:
+            return None
+        feed_config = self.config
+        return IncrementalFilter(
+            posted_hashes=array.array("q", sorted(posted_hashes)),
+            max_consecutive_posted=self.incremental_max_consecutive_posted,
+            reverse=feed_config.get("order") == "reverse",
+            https=bool(feed_config.get("https")),
+            www=feed_config.get("www") is not False,
+            url_sub=(feed_config.get("sub") or {}).get("url"),
+        )
+
+    def _parse_entries(
+        self, url: str, url_content: bytes, incremental_filter: Optional[IncrementalFilter] = None, min_published_time: Optional[float] = None
+    ) -> Tuple[EntryBatch, List[str], int, int]:
+        """Return the batch of parsed entries, the URLs to follow, the number of skipped posted entries, and the number of removed old entries."""
         # Note: Using a separate temporary process is a workaround for memory leaks of hext, feedparser, etc.
         # with mp.Pool(1) as pool:
-        log.debug(f"Using process worker from pool to parse entries for {self} using {self.parser_name}.")
-        raw_entries, urls = self.worker_pool.apply(_parse_entries, (self.parser_name, self.parser_selector, self.parser_follower, url_content))
-        log.debug(f"Used process worker from pool to parse {len(raw_entries):,} raw entries and {len(urls):,} URLs for {self} using {self.parser_name}.")
-        entries = [FeedEntry(title=e.title, long_url=e.link, summary=e.summary, categories=e.categories, data=dict(e), feed_reader=self) for e in raw_entries]
-        log.debug(f"Converted {len(raw_entries):,} raw entries to actual entries for {self}.")
-        return entries, urls
-
-    def read(self) -> "Feed":  # pylint: disable=too-many-locals,too-many-statements
+        if url in _shared_url_parse_specs():
+            raw_entries, urls = self._parse_shared_entries(url, url_content)
+            num_raw_entries = len(raw_entries)
+            if incremental_filter:
+                raw_entries = incremental_filter(raw_entries)
+            num_skipped = num_raw_entries - len(raw_entries)
+            if self.entry_normalizer:
+                log.debug(f"Normalizing {len(raw_entries):,} raw entries for {self} in the main process because their URL is shared.")
+                entries, num_old, num_removed = self.entry_normalizer(raw_entries, min_published_time)
+                self._log_normalized_entries(entries, num_removed)
+                return entries, urls, num_skipped, num_old
+        elif self.entry_normalizer:
+            return self._parse_and_normalize_entries(url_content, incremental_filter, min_published_time)
+        else:
+            log.debug(f"Using process worker from pool to parse entries for {self} using {self.parser_name}.")
+            [result] = self.worker_pool.apply(_parse_entries, (url_content, [self.parse_spec], incremental_filter))
+            if isinstance(result, Exception):
+                raise result
+            raw_entries, urls, num_skipped = result
+            log.debug(
+                f"Used process worker from pool to parse {len(raw_entries):,} raw entries and {len(urls):,} URLs, "
+                f"skipping {num_skipped:,} already posted raw entries, for {self} using {self.parser_name}."
+            )
+        entries, num_old = _remove_old_entries(EntryBatch.from_raw_entries(raw_entries), min_published_time)
+        log.debug(f"Converted {len(raw_entries):,} raw entries to a batch of entries for {self}, removing {num_old:,} old entries.")
+        return entries, urls, num_skipped, num_old
+
+    def _parse_and_normalize_entries(
+        self, url_content: bytes, incremental_filter: Optional[IncrementalFilter] = None, min_published_time: Optional[float] = None
+    ) -> Tuple[EntryBatch, List[str], int, int]:
+        log.debug(f"Using process worker from pool to parse and normalize entries for {self} using {self.parser_name}.")
+        result = self.worker_pool.apply(_parse_and_normalize_entries, (url_content, self.parse_spec, incremental_filter, min_published_time, self.entry_normalizer))
+        if isinstance(result, Exception):
+            raise result
+        entries, urls, num_skipped, num_old, num_removed = result
+        log.debug(
+            f"Used process worker from pool to parse and normalize {len(entries):,} entries and {len(urls):,} URLs, "
+            f"skipping {num_skipped:,} already posted raw entries and removing {num_old:,} old entries, for {self} using {self.parser_name}."
+        )
+        self._log_normalized_entries(entries, num_removed)
+        return entries, urls, num_skipped, num_old
+
+    def _log_normalized_entries(self, entries: EntryBatch, num_removed: Dict[str, int]) -> None:
+        log.debug("Normalized entries to %s for %s, having removed %s.", len(entries), self, dict_str(num_removed) if num_removed else 0)
+
+    def _parse_shared_entries(self, url: str, url_content: bytes) -> "ParseResult":
+        """Return the raw entries and URLs to follow for the given URL which is shared by feeds having multiple parse specs.
+
+        The content is parsed for the parse specs of all feeds sharing the URL, and the results are cached for their use.
+        """
+        spec = self.parse_spec
+        key = (url, hashlib.blake2b(url_content, digest_size=16).digest())  # Note: A short hash could collide for a changed content, using a wrong result.
+        with _SHARED_PARSE_RESULTS_LOCK:
+            result = (_SHARED_PARSE_RESULTS.get(key) or {}).get(spec)
+        if result is not None:
+            log.debug(f"Using cached shared parse result of {len(result[0]):,} raw entries and {len(result[1]):,} URLs for {url} for {self} using {self.parser_name}.")
+        else:
+            specs = [spec, *(s for s in _shared_url_parse_specs()[url] if s != spec)]
+            log.debug(f"Using process worker from pool to parse entries for {url} for {self} and for {len(specs) - 1} other parse specs sharing the URL.")
+            results = dict(zip(specs, self.worker_pool.apply(_parse_entries, (url_content, specs))))
+            log.debug(f"Used process worker from pool to parse entries for {url} for {self} and for {len(specs) - 1} other parse specs sharing the URL.")
+            with _SHARED_PARSE_RESULTS_LOCK:
+                _SHARED_PARSE_RESULTS[key] = {s: r[:2] for s, r in results.items() if not isinstance(r, Exception)}
+            if isinstance(result := results[spec], Exception):
+                raise result
+            result = result[:2]
+        return cast("ParseResult", result)
+
+    def select_unposted_long_urls(self, long_urls: List[str]) -> List[str]:
+        """Return the unposted long URLs out of the given ones as per the configured database deduplication strategy."""
+        db_dedup_strategy = self.config.get("dedup") or config.DEDUP_STRATEGY_DEFAULT
+        if db_dedup_strategy == "channel":
+            return self.db.select_unposted_for_channel(self.channel, self.name, long_urls)
+        assert db_dedup_strategy == "feed"
+        return self.db.select_unposted_for_channel_feed(self.channel, self.name, long_urls)
+
+    @property
+    def parse_spec(self) -> "ParseSpec":
+        """Return the parse spec of the feed."""
+        return self.parser_name, self.parser_selector, self.parser_follower, self.entry_fields
+
+    def read(self) -> "Feed":  # pylint: disable=too-many-branches,too-many-locals,too-many-statements
         """Read feed with entries."""
         timer = Timer()
         feed_config = self.config
@@ -296,7 +516,11 @@ class FeedReader:
         urls_pending = self.urls.copy()
         urls_read: OrderedSet[str] = OrderedSet()
         url_read_approach_counts: collections.Counter = collections.Counter()
-        entries = []
+        batches = []
+        num_skipped_by_incremental_parsing = 0
+        num_removed_by_max_age = 0
+        incremental_filter = self._incremental_filter()
+        min_published_time = self._min_published_time()
         while urls_pending:
             # Read URL
             url = urls_pending.pop(0)
@@ -307,14 +531,20 @@ class FeedReader:
 
             # Parse entries of URL
             log.debug(f"Parsing entries for {url} for {self} using {self.parser_name}.")
-            selected_entries, follow_urls = self._parse_entries(url_content.content)
+            selected_entries, follow_urls, num_skipped, num_old = self._parse_entries(url, url_content.content, incremental_filter, min_published_time)
             follow_urls = OrderedSet(follow_urls)
-            entries.extend(selected_entries)
+            batches.append(selected_entries)
+            num_skipped_by_incremental_parsing += num_skipped
+            num_removed_by_max_age += num_old
             urls_pending.update(follow_urls - urls_read)
 
             # Alert if no entries of URL
             entries_desc = f"{len(selected_entries):,} entries and {len(follow_urls):,} followable URLs for {url} of {self} using {self.parser_name!r} parser"
-            if selected_entries:
+            if num_skipped:
+                entries_desc += f" after skipping {num_skipped:,} already posted entries"
+            if num_old:
+                entries_desc += f"{' and' if num_skipped else ' after'} removing {num_old:,} old entries"
+            if selected_entries or num_skipped or num_old:
                 log.debug(f"Parsed {entries_desc}.")
             else:
                 log_msg = f"There are {entries_desc}."
@@ -334,14 +564,27 @@ class FeedReader:
 
         # Log entries
         url_read_approach_desc = readable_list([f"{count} URLs {approach}" for approach, count in url_read_approach_counts.items()])
-        num_before_processing = len(entries)
+        batch = EntryBatch.concat(batches)
+        num_before_processing = len(batch)
         log.debug(f"Read {num_before_processing:,} entries via {url_read_approach_desc} for {self} using {self.parser_name!r} parser in {timer}.")
+        if num_skipped_by_incremental_parsing:
+            log.debug(f"Skipped {num_skipped_by_incremental_parsing:,} already posted entries for {self} using incremental parsing.")
+        if num_removed_by_max_age:
+            log.log(
+                logging.DEBUG if self.has_removed_by_max_age else logging.INFO,
+                f"Removed {num_removed_by_max_age:,} entries published before {time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(min_published_time))} UTC for {self}.",
+            )
+            self.has_removed_by_max_age = True
 
         # Conditionally process entries
+        entries: List[FeedEntry] = []
+        num_posted = 0
         if num_before_processing > 0:
             # Process entries
-            entries = self._process_entries(entries)
-            num_after_processing = len(entries)
+            entries, num_posted = self._process_entries(batch)
+            num_after_processing = len(entries) + num_posted  # Posted entries are assumed to have passed the filters of the text pipeline, as they did when they were posted.
+            if num_posted:
+                log.debug(f"Skipped the text pipeline for {num_posted:,} already posted entries for {self}.")
 
             # Alert if no processed entries for feed
             entries_count_desc = {0: "but 0", num_before_processing: "and"}.get(num_after_processing, f"and {num_after_processing:,}")
@@ -359,7 +602,7 @@ class FeedReader:
                 else:
                     log.debug(log_msg)
 
-        return Feed(entries=entries, reader=self, read_approach=url_read_approach_desc, read_time_used=timer())
+        return Feed(entries=entries, reader=self, read_approach=url_read_approach_desc, read_time_used=timer(), num_posted=num_posted)
 
     @property
     def worker_pool(self) -> multiprocessing.pool.Pool:  # Can't use return type "mp.pool.Pool".
@@ -385,6 +628,7 @@ class Feed:
     reader: FeedReader
     read_approach: str
     read_time_used: float
+    num_posted: int = 0  # Number of unique posted entries which were removed when reading.
 
     def __str__(self):
         return f"feed {self.name} of {self.channel}"
@@ -422,14 +666,8 @@ class Feed:
         log.debug(f"Retrieving unposted entries for {self}.")
         entries = self.entries
 
-        long_urls = [entry.long_url for entry in entries]
-        db_dedup_strategy = self.reader.config.get("dedup") or config.DEDUP_STRATEGY_DEFAULT
-        if db_dedup_strategy == "channel":
-            unposted_long_urls = self.reader.db.select_unposted_for_channel(self.channel, self.name, long_urls)
-        else:
-            assert db_dedup_strategy == "feed"
-            unposted_long_urls = self.reader.db.select_unposted_for_channel_feed(self.channel, self.name, long_urls)
-        unique_unposted_long_urls = set(unposted_long_urls)
+        # Note: The entries were already deduplicated against the database when they were read, but entries can since have been posted by another feed.
+        unique_unposted_long_urls = set(self.reader.select_unposted_long_urls([entry.long_url for entry in entries]))
         unposted_entries = [entry for entry in entries if entry.long_url in unique_unposted_long_urls]
         log.debug(f"Returning {len(unposted_entries)} unposted entries out of {len(entries)} for {self}.")
         return unposted_entries
@@ -513,3 +751,22 @@ class Feed:
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Publisher") as executor:
                 for _ in executor.map(_publish, publishers):
                     pass
+
+
+# pylint: disable=missing-class-docstring,missing-function-docstring
+class TestMaxAge(unittest.TestCase):
+    def test_max_age(self):
+        examples = [(None, None), (False, None), (True, True), (24, 24), (0.5, 0.5), (0, None), (0.0, None), (-1, None), ("24", None)]
+        for max_age, expected in examples:
+            with self.subTest(max_age=max_age):
+                self.assertIs(type(actual := _max_age({"max_age": max_age})), type(expected))
+                self.assertEqual(actual, expected)
+        self.assertIsNone(_max_age({}))
+
+    def test_entry_fields(self):
+        for max_age in (True, 24):
+            with self.subTest(max_age=max_age):
+                self.assertIn("published_time", _entry_fields({"max_age": max_age}, "feed") or ())
+        for max_age in (None, False, 0, -1):
+            with self.subTest(max_age=max_age):
+                self.assertNotIn("published_time", _entry_fields({"max_age": max_age}, "feed") or ())
@@ -1,2 +1,3 @@
 """Import all parsers."""
-from . import feedparser, hext, jmespath, pandas
+from . import css, feedparser, hext, jmespath, pandas, xpath
+from ._batch import ParseResult, ParseSpec, parse_batch
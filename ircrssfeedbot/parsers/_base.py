@@ -1,7 +1,8 @@
 """Base parser class with helper attributes and methods for parsers."""
 import abc
+import copy
 import dataclasses
-from typing import Dict, List, Optional, Union
+from typing import AbstractSet, Any, Dict, List, Optional, Union
 
 
 @dataclasses.dataclass
@@ -11,6 +12,7 @@ class BaseParser(abc.ABC):
     selector: Optional[str]  # Is None for feedparser.
     follower: Optional[str]
     content: bytes
+    fields: Optional[AbstractSet[str]] = None  # If not None, parsers which support it return only these keys for each entry.
 
     @property
     def _raw_urls(self) -> List[Union[Dict[str, str], str]]:
@@ -20,6 +22,20 @@ class BaseParser(abc.ABC):
         """
         return []
 
+    def with_spec(self, selector: Optional[str], follower: Optional[str], fields: Optional[AbstractSet[str]]) -> "BaseParser":
+        """Return a copy of the parser for the given spec.
+
+        The copy shares any document which has already been parsed from the content, e.g. an HTML tree or JSON data.
+        """
+        parser = copy.copy(self)
+        parser.selector, parser.follower, parser.fields = selector, follower, fields
+        return parser
+
+    def _prune(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the given raw entry with only the keys in `fields` if it is not None."""
+        fields = self.fields
+        return entry if (fields is None) else {k: v for k, v in entry.items() if k in fields}
+
     @property
     @abc.abstractmethod
     def entries(self) -> List:
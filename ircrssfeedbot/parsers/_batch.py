@@ -0,0 +1,30 @@
+"""Parse a content using multiple parser specs, parsing its document only once per parser."""
+from importlib import import_module
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from ..entry import RawFeedEntry
+from ._base import BaseParser
+
+ParseSpec = Tuple[str, Optional[str], Optional[str], Optional[FrozenSet[str]]]  # Parser name, selector, follower, fields.
+ParseResult = Tuple[List[RawFeedEntry], List[str]]  # Raw entries, URLs to follow.
+
+
+def parse_batch(content: bytes, specs: Sequence[ParseSpec]) -> List[Union[ParseResult, Exception]]:
+    """Return the parse result or the raised exception for each of the given specs.
+
+    The fields of a spec are names of raw entry properties or raw entry keys, as for `RawFeedEntry.raw_keys`.
+    """
+    parsers: Dict[str, BaseParser] = {}
+    results: List[Union[ParseResult, Exception]] = []
+    for parser_name, selector, follower, fields in specs:
+        try:
+            parser_module = import_module(f".{parser_name}", __package__)
+            raw_keys = None if (fields is None) else parser_module.RawFeedEntry.raw_keys(fields)
+            if parser_name in parsers:
+                parser = parsers[parser_name].with_spec(selector=selector, follower=follower, fields=raw_keys)
+            else:
+                parser = parsers[parser_name] = parser_module.Parser(selector=selector, follower=follower, content=content, fields=raw_keys)
+            results.append((parser.entries, parser.urls))
+        except Exception as exception:  # pylint: disable=broad-except
+            results.append(exception)
+    return results
@@ -0,0 +1,32 @@
+"""Parse entries using `lxml` CSS selectors."""
+import dataclasses
+
+import lxml.cssselect
+
+from ..entry import RawFeedEntry
+from .xpath import Parser as XPathParser
+from .xpath import Selector
+
+__all__ = ["Parser", "RawFeedEntry"]
+
+
+@dataclasses.dataclass
+class Parser(XPathParser):
+    """Parse entries using `lxml` CSS selectors.
+
+    The first line of a selector is the CSS selector for the entry elements.
+    Each subsequent line is of the form `key: selector`, with the selector being matched within each entry element.
+    The text content of a matching element is used unless the selector ends with ` @attribute`, in which case the value
+    of the attribute is used. The selector before ` @attribute` can be omitted to use the entry element itself.
+    A key having multiple matches for an entry has a list of values.
+    """
+
+    @staticmethod
+    def _compile(expression: str) -> Selector:
+        css, attribute = expression, None
+        if (tokens := expression.rsplit(None, 1)) and tokens[-1].startswith("@"):
+            css, attribute = (tokens[0] if (len(tokens) == 2) else ""), tokens[-1][1:]
+        select = lxml.cssselect.CSSSelector(css) if css else (lambda element: [element])
+        if attribute is None:
+            return select
+        return lambda element: [value for e in select(element) if (value := e.get(attribute)) is not None]
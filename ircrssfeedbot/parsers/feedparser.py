@@ -1,11 +1,13 @@
 """Parse entries using `feedparser`."""
 import dataclasses
-from typing import List
+from functools import cached_property
+from typing import Any, Dict, List, Optional
 
 import feedparser
 
 from ..entry import RawFeedEntry as BaseRawFeedEntry
 from ..gnews import decode_google_news_url
+from ..util.datetime import timestamp
 from ..util.lxml import sanitize_xml
 from ._base import BaseParser
 
@@ -13,6 +15,13 @@ from ._base import BaseParser
 class RawFeedEntry(BaseRawFeedEntry):
     """Raw feed entry."""
 
+    PROPERTY_KEYS = {
+        **BaseRawFeedEntry.PROPERTY_KEYS,
+        "link": frozenset({"link", "links", "feedburner_origlink"}),
+        "categories": frozenset({"tags"}),
+        "published_time": frozenset({"published_parsed", "updated_parsed"}),
+    }
+
     @property
     def link(self) -> str:
         link = self.get("link") or self["links"][0]["href"]
@@ -26,13 +35,21 @@ class RawFeedEntry(BaseRawFeedEntry):
     def categories(self) -> List[str]:
         return [term for tag in self.get("tags", []) if (term := (tag["term"] or "").strip())]  # tag["term"] is None in https://www.sciencemag.org/rss/news_current.xml
 
+    @property
+    def published_time(self) -> Optional[float]:
+        return timestamp(self.get("published_parsed") or self.get("updated_parsed"))
+
 
 @dataclasses.dataclass
 class Parser(BaseParser):
     """Parse entries using `feedparser`."""
 
+    @cached_property
+    def _parsed_entries(self) -> List[Dict[str, Any]]:
+        content = sanitize_xml(self.content)  # e.g. for unescaped "&" char in https://deepmind.com/blog/feed/basic/
+        return feedparser.parse(content.lstrip())["entries"]
+
     @property
     def entries(self) -> List[RawFeedEntry]:
         """Return a list of parsed raw entries."""
-        content = sanitize_xml(self.content)  # e.g. for unescaped "&" char in https://deepmind.com/blog/feed/basic/
-        return [RawFeedEntry(e) for e in feedparser.parse(content.lstrip())["entries"]]
+        return [RawFeedEntry(self._prune(e)) for e in self._parsed_entries]
@@ -38,4 +38,4 @@ class Parser(BaseParser):
     @property
     def entries(self) -> List[RawFeedEntry]:
         """Return a list of parsed raw entries."""
-        return [RawFeedEntry(e) for e in self._parse(cast(str, self.selector))]
+        return [RawFeedEntry(self._prune(e)) for e in self._parse(cast(str, self.selector))]
@@ -2,7 +2,7 @@
 import dataclasses
 import io
 import json
-from typing import Dict, List, cast
+from typing import AbstractSet, Any, Dict, List, Optional, cast
 
 import numpy as np
 import pandas as pd
@@ -11,16 +11,25 @@ from .. import util
 from ..entry import RawFeedEntry
 from ._base import BaseParser
 
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional. If installed, it is also usable by pandas via `engine="pyarrow"`.
+    pa = None
+
 
 @dataclasses.dataclass
 class Parser(BaseParser):
     """Parse entries using `pandas`."""
 
-    def _parse(self, selector: str) -> List[Dict[str, str]]:
+    def _parse(self, selector: str, fields: Optional[AbstractSet[str]] = None) -> List[Dict[str, Any]]:
         eval_globals = {"json": json, "np": np, "pd": pd, "util": util}
+        if pa is not None:
+            eval_globals["pa"] = pa
         eval_locals = {"file": io.BytesIO(self.content)}
         df = eval(f"pd.{selector}", eval_globals, eval_locals)  # pylint: disable=eval-used
-        return [dict(e) for _, e in df.iterrows()]
+        if fields is not None:
+            df = df[[c for c in df.columns if c in fields]]  # Avoids converting unused columns.
+        return df.to_dict("records")  # Note: This is much faster than using df.iterrows().
 
     @property
     def _raw_urls(self) -> List[Dict[str, str]]:  # type: ignore
@@ -30,4 +39,4 @@ class Parser(BaseParser):
     @property
     def entries(self) -> List[RawFeedEntry]:
         """Return a list of raw entries."""
-        return [RawFeedEntry(e) for e in self._parse(cast(str, self.selector))]
+        return [RawFeedEntry(e) for e in self._parse(cast(str, self.selector), self.fields)]
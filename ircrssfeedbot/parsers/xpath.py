@@ -0,0 +1,73 @@
+"""Parse entries using `lxml` XPath expressions."""
+import dataclasses
+import re
+from typing import AbstractSet, Any, Callable, Dict, List, Optional, Union, cast
+
+import lxml.etree
+import lxml.html
+
+from ..entry import RawFeedEntry
+from ._base import BaseParser
+
+Selector = Callable[[Any], Any]  # Compiled selector which returns the matches for a context element.
+
+_HTML_PARSER_UTF8 = lxml.html.HTMLParser(encoding="utf-8")
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset", flags=re.IGNORECASE)
+
+
+@dataclasses.dataclass
+class Parser(BaseParser):
+    """Parse entries using `lxml` XPath expressions.
+
+    The first line of a selector is the expression for the entry elements.
+    Each subsequent line is of the form `key: expression`, with the expression being evaluated for each entry element.
+    A key having multiple matches for an entry has a list of values.
+    """
+
+    def __post_init__(self):
+        # Note: Bytes are parsed without first decoding them to str. UTF-8 is used as with hext unless a charset is declared.
+        parser = None if _META_CHARSET_RE.search(self.content, 0, 4096) else _HTML_PARSER_UTF8
+        try:
+            self.html = lxml.html.document_fromstring(self.content, parser=parser)
+        except lxml.etree.ParserError:  # This is raised for empty or whitespace-only content, which has no entries.
+            self.html = lxml.html.Element("html")
+
+    @staticmethod
+    def _compile(expression: str) -> Selector:
+        return lxml.etree.XPath(expression)
+
+    @staticmethod
+    def _value(match: Any) -> str:
+        return match.text_content() if isinstance(match, lxml.etree.ElementBase) else str(match)
+
+    def _parse(self, selector: str, fields: Optional[AbstractSet[str]] = None) -> List[Dict[str, Union[str, List[str]]]]:  # pylint: disable=too-many-locals
+        entries_expression, *field_lines = [line for line in (line.strip() for line in selector.strip().splitlines()) if line]
+        select_entries = self._compile(entries_expression)
+        field_selectors: Dict[str, Selector] = {}
+        for line in field_lines:
+            key, separator, expression = line.partition(":")
+            if not separator:
+                raise ValueError(f"The selector line {line!r} is not of the form `key: expression`.")
+            if (key := key.strip()) and ((fields is None) or (key in fields)):  # Unused keys are not evaluated.
+                field_selectors[key] = self._compile(expression.strip())
+
+        entries = []
+        for element in select_entries(self.html):
+            entry: Dict[str, Union[str, List[str]]] = {}
+            for key, select_field in field_selectors.items():
+                matches = select_field(element)
+                values = [self._value(m) for m in (matches if isinstance(matches, list) else [matches])]
+                if values:
+                    entry[key] = values[0] if (len(values) == 1) else values
+            entries.append(entry)
+        return entries
+
+    @property
+    def _raw_urls(self) -> List[Dict[str, str]]:  # type: ignore
+        """Return a list of parsed raw URLs to scrape."""
+        return cast(List[Dict[str, str]], self._parse(self.follower)) if self.follower else []
+
+    @property
+    def entries(self) -> List[RawFeedEntry]:
+        """Return a list of parsed raw entries."""
+        return [RawFeedEntry(e) for e in self._parse(cast(str, self.selector), self.fields)]
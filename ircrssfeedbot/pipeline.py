@@ -0,0 +1,380 @@
+"""Entry processing pipeline compiled from a feed config."""
+import collections
+import dataclasses
+import hashlib
+import itertools
+import logging
+import re
+import string
+import types
+from typing import AbstractSet, Callable, Dict, Final, FrozenSet, List, Optional, Tuple, cast
+
+import cachetools
+import emoji
+
+from . import config
+from .entry import EntryBatch
+from .util.bs4 import html_to_text
+from .util.re import MultiPattern
+from .util.requests import find_redirect
+from .util.set import leaves
+from .util.textwrap import shorten_to_bytes_width
+
+log = logging.getLogger(__name__)
+
+
+_ENTRY_FIELDS: Final = frozenset({"title", "long_url", "summary", "categories", "data"})  # Excludes the fields which are not read by any stage.
+_LIST_KEYS_TO_ENTRY_FIELDS: Final = {"title": "title", "url": "long_url", "category": "categories"}
+_SUB_KEYS_TO_ENTRY_FIELDS: Final = {"title": "title", "url": "long_url", "summary": "summary"}
+_FORMAT_PARAMS_TO_ENTRY_FIELDS: Final = {"title": "title", "url": "long_url", "summary": "summary", "categories": "categories", "feed": None}  # Other params are from data.
+
+
+@dataclasses.dataclass(frozen=True)
+class Stage:
+    """Entry processing stage."""
+
+    name: str
+    process: Callable[[EntryBatch], Optional[List[bool]]]  # Updates the batch in place. A filter returns whether each entry is to be kept.
+    reads: FrozenSet[str]  # Names of the entry fields which can affect the processing.
+    writes: FrozenSet[str] = frozenset()  # Names of the entry fields which can be updated.
+    is_filter: bool = False  # Whether the stage can remove entries.
+
+
+def _map_stage(name: str, field: str, func: Callable[[str], str]) -> Stage:
+    """Return a stage which maps each value of an entry field using the given function."""
+
+    def _map(batch: EntryBatch) -> None:
+        setattr(batch, field, list(map(func, getattr(batch, field))))
+
+    return Stage(name, _map, reads=frozenset({field}), writes=frozenset({field}))
+
+
+def _redirect(url: str) -> str:
+    """Return a redirected URL."""
+    return find_redirect(url)
+
+
+def _blacklist(patterns: Dict[str, MultiPattern]) -> Callable[[EntryBatch], List[bool]]:
+    """Return a function which removes blacklisted entries."""
+
+    def _blacklist_batch(batch: EntryBatch) -> List[bool]:
+        return [match is None for match in batch.matching_patterns(patterns)]
+
+    return _blacklist_batch
+
+
+def _whitelist(patterns: Dict[str, MultiPattern]) -> Callable[[EntryBatch], List[bool]]:
+    """Return a function which keeps only whitelisted entries."""
+
+    def _whitelist_batch(batch: EntryBatch) -> List[bool]:
+        matches = batch.matching_patterns(patterns)
+        for index, match in enumerate(matches):
+            if match and (match[0] == "title"):
+                batch.matching_title_search_pattern[index] = match[1]
+        return [match is not None for match in matches]
+
+    return _whitelist_batch
+
+
+def _https(url: str) -> str:
+    """Return a URL enforcing HTTPS."""
+    return url.replace("http://", "https://", 1) if url.startswith("http://") else url
+
+
+def _www(url: str) -> str:
+    """Return a URL without WWW."""
+    for prefix in ("https://www.", "http://www."):
+        if url.startswith(prefix):
+            url = url.replace(prefix, prefix[:-4], 1)
+    return url
+
+
+def _emoji(title: str) -> str:
+    """Return a title without emojis."""
+    return title if title.isascii() else emoji.replace_emoji(title, "")  # No emoji is ASCII.
+
+
+def _sub(sub_attr_config: Dict[str, str]) -> Callable[[str], str]:
+    """Return a function which substitutes a value using a precompiled pattern."""
+    pattern, repl = re.compile(sub_attr_config["pattern"]), sub_attr_config["repl"]
+
+    def _sub_value(value: str) -> str:
+        return pattern.sub(repl, value) if value else value
+
+    return _sub_value
+
+
+def _format(format_config: Dict, feed_url: str) -> Callable[[EntryBatch], None]:
+    """Return a function which formats entries using precompiled patterns."""
+    format_re = [(re_key, re.compile(re_val)) for re_key, re_val in (format_config.get("re") or {}).items()]
+    format_str = format_config.get("str") or {}
+    title_format_str, url_format_str = format_str.get("title"), format_str.get("url")  # Formatting with "{title}" or "{url}" respectively is a no-op.
+    feed_params = types.SimpleNamespace(url=feed_url)
+
+    def _format_batch(batch: EntryBatch) -> None:
+        titles, urls = batch.title, batch.long_url
+        for index, (title, url, summary, categories, data) in enumerate(zip(batch.title, batch.long_url, batch.summary, batch.categories, batch.data)):
+            # Collect:
+            params = {**data, "title": title, "url": url, "summary": summary, "categories": categories, "feed": feed_params}
+            for re_key, pattern in format_re:
+                if match := pattern.search(params[re_key]):
+                    params.update(match.groupdict())
+            # Format title:
+            if title_format_str is not None:
+                try:
+                    titles[index] = title_format_str.format_map(params)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.warning(f"Unable to format entry title for entry {url} of {feed_url} due to exception {exc!r} using format string {title_format_str!r}.")
+            # Format URL:
+            if url_format_str is not None:
+                try:
+                    urls[index] = url_format_str.format_map(params)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.warning(f"Unable to format entry URL for entry {url} of {feed_url} due to exception {exc!r} using format string {url_format_str!r}.")
+
+    return _format_batch
+
+
+def _format_reads(format_config: Dict) -> FrozenSet[str]:
+    """Return the names of the entry fields which can affect the formatting of an entry using the given format config."""
+    format_params = set(format_config.get("re") or {})
+    for format_str in (format_config.get("str") or {}).values():
+        try:
+            format_params.update(re.split(r"[.\[]", name, maxsplit=1)[0] for _, name, _, _ in string.Formatter().parse(format_str) if name)
+        except ValueError:
+            return _ENTRY_FIELDS
+    return frozenset(f for p in format_params if (f := _FORMAT_PARAMS_TO_ENTRY_FIELDS.get(p, "data")))
+
+
+def _escape(url: str) -> str:
+    """Return a URL with escaped spaces."""
+    # e.g. for https://covid-api.com/api/reports?iso=USA&region_province=New York&date=2020-03-15
+    return url.strip().replace(" ", "%20")
+
+
+def _html_title(title: str) -> str:
+    """Return a title without HTML tags."""
+    # e.g. for http://rss.sciencedirect.com/publication/science/08999007  (Elsevier Nutrition journal)
+    return html_to_text(title)
+
+
+def _html_summary(summary: str) -> str:
+    """Return a summary without HTML tags."""
+    return html_to_text(summary, max_bytes=config.QUOTE_LEN_MAX)  # The summary is used only in the message.
+
+
+def _quotes(title: str, quote_begin: str = "“", quote_end: str = "”") -> str:
+    """Return a title without unicode quotes around it."""
+    # e.g. for https://www.sciencedirect.com/science/article/abs/pii/S0899900718307883
+    if (len(title) > 2) and (title[0] == quote_begin) and (title[-1] == quote_end):
+        unquoted_title = title[1:-1]
+        if (quote_begin not in unquoted_title) and (quote_end not in unquoted_title):
+            return unquoted_title
+    return title
+
+
+def _periods(title: str) -> str:
+    """Return a single-sentence title without trailing periods."""
+    if len(title.rstrip().split(". ", maxsplit=1)) < 2:  # Crude check.
+        return title.rstrip().rstrip(".")  # e.g. for PubMed RSS feeds
+    return title
+
+
+def _caps(title: str) -> str:
+    """Return an all-caps multi-word title capitalized."""
+    title_has_multiple_words = len(title.split(maxsplit=1)) > 1
+    if title_has_multiple_words and title.isupper():  # e.g. for https://redd.it/fm8z83
+        return title.capitalize()
+    return title
+
+
+def _shorten(title: str) -> str:
+    """Return a shortened title."""
+    return shorten_to_bytes_width(title, config.TITLE_MAX_BYTES)
+
+
+class PipelineMemo:
+    """Bounded memo of the results of a pipeline by the values of the entry fields which it reads.
+
+    Its entries are evicted by age and by size.
+    """
+
+    def __init__(self, fingerprint: str, maxsize: int = config.CACHE_MAXSIZE__PIPELINE_MEMO, ttl: float = config.CACHE_TTL__PIPELINE_MEMO):
+        self._results: cachetools.TTLCache = cachetools.TTLCache(maxsize=maxsize, ttl=ttl)
+        self._hash = hashlib.blake2b(fingerprint.encode(), digest_size=16)  # Is copied to hash the values of each entry along with the fingerprint.
+        self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __str__(self):
+        return f"{self.hits:,} hits out of {self.hits + self.misses:,} lookups ({self.hit_rate:.0%}) with {len(self):,} results"
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of lookups which were hits."""
+        num_lookups = self.hits + self.misses
+        return (self.hits / num_lookups) if num_lookups else 0.0
+
+    def key(self, values: Tuple) -> bytes:
+        """Return the key for the given entry field values."""
+        hash_ = self._hash.copy()
+        hash_.update(repr(values).encode())
+        return hash_.digest()
+
+    def get(self, key: bytes) -> Optional[Tuple[Optional[str], Tuple]]:
+        """Return the result for the given key if it is present, updating the hit rate."""
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def __setitem__(self, key: bytes, result: Tuple[Optional[str], Tuple]) -> None:
+        self._results[key] = result
+
+
+@dataclasses.dataclass(frozen=True)
+class Pipeline:
+    """Ordered entry processing stages compiled once from a feed config."""
+
+    stages: Tuple[Stage, ...]
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def __str__(self):
+        return " → ".join(stage.name for stage in self.stages)
+
+    @classmethod
+    def from_config(cls, feed_config: Dict, blacklist: Dict[str, MultiPattern], whitelist: Dict[str, MultiPattern]) -> "Pipeline":
+        """Return the pipeline for the given feed config and patterns, preserving the documented order of processing."""
+        stages: List[Stage] = []
+        if feed_config.get("redirect"):
+            stages.append(_map_stage("redirect", "long_url", _redirect))
+        if feed_config.get("blacklist", {}):
+            blacklist_reads = frozenset(f for k, f in _LIST_KEYS_TO_ENTRY_FIELDS.items() if leaves(feed_config["blacklist"].get(k)))
+            stages.append(Stage("blacklist", _blacklist(blacklist), reads=blacklist_reads, is_filter=True))
+        if feed_config.get("whitelist", {}):
+            whitelist_reads = frozenset(f for k, f in _LIST_KEYS_TO_ENTRY_FIELDS.items() if leaves(feed_config["whitelist"].get(k)))
+            stages.append(Stage("whitelist", _whitelist(whitelist), reads=whitelist_reads, writes=frozenset({"matching_title_search_pattern"}), is_filter=True))
+        if feed_config.get("https"):
+            stages.append(_map_stage("https", "long_url", _https))
+        if feed_config.get("www") is False:
+            stages.append(_map_stage("www", "long_url", _www))
+        if feed_config.get("emoji") is False:
+            stages.append(_map_stage("emoji", "title", _emoji))
+        for sub_key, sub_attr_config in (feed_config.get("sub") or {}).items():
+            if sub_attr_config and (entry_attr := _SUB_KEYS_TO_ENTRY_FIELDS.get(sub_key)):
+                stages.append(_map_stage(f"sub.{sub_key}", entry_attr, _sub(sub_attr_config)))
+        if format_config := feed_config.get("format"):
+            format_writes = frozenset(f for k, f in {"title": "title", "url": "long_url"}.items() if k in (format_config.get("str") or {}))
+            stages.append(Stage("format", _format(format_config, feed_config["url"]), reads=_format_reads(format_config), writes=format_writes))
+        stages += [
+            _map_stage("escape", "long_url", _escape),
+            _map_stage("html.title", "title", _html_title),
+            _map_stage("html.summary", "summary", _html_summary),
+            _map_stage("quotes", "title", _quotes),
+            _map_stage("periods", "title", _periods),
+            _map_stage("caps", "title", _caps),
+            _map_stage("shorten", "title", _shorten),
+        ]
+        return cls(tuple(stages))
+
+    def prune(self, fields: AbstractSet[str]) -> "Pipeline":
+        """Return a pipeline without the stages which affect neither the given entry fields nor which entries are kept."""
+        kept: List[Stage] = []
+        needed = set(fields)
+        for stage in reversed(self.stages):
+            if stage.is_filter or (stage.writes & needed):
+                kept.insert(0, stage)
+                needed |= stage.reads
+        return Pipeline(tuple(kept))
+
+    def split(self, fields: AbstractSet[str]) -> Tuple["Pipeline", "Pipeline"]:
+        """Return a pipeline of the stages needed for the given entry fields and a pipeline of the remaining stages.
+
+        Running the two pipelines in turn is equivalent to running this pipeline.
+        The given fields, as produced by the first pipeline, are final.
+        """
+        # Note: A stage is moved after a later stage of the first pipeline only if neither stage reads or writes a field written by the other.
+        first: List[Stage] = []
+        needed = set(fields)
+        for stage in reversed(self.stages):
+            if (stage.writes & needed) or any((stage.reads | stage.writes) & later_stage.writes for later_stage in first):
+                first.insert(0, stage)
+                needed |= stage.reads
+        remaining = [stage for stage in self.stages if stage not in first]
+        return Pipeline(tuple(first)), Pipeline(tuple(remaining))
+
+    @property
+    def reads(self) -> FrozenSet[str]:
+        """Return the names of the entry fields which can affect the processing."""
+        return frozenset().union(*(stage.reads for stage in self.stages))
+
+    @property
+    def writes(self) -> FrozenSet[str]:
+        """Return the names of the entry fields which can be updated."""
+        return frozenset().union(*(stage.writes for stage in self.stages))
+
+    def __call__(self, batch: EntryBatch, memo: Optional[PipelineMemo] = None) -> Tuple[EntryBatch, Dict[str, int]]:
+        """Return the processed batch along with the number of removed entries by stage name.
+
+        Each stage is applied to a column of the batch at once.
+
+        If a memo is given, an entry whose read fields have the same values as those of a previously processed entry gets its result from the memo instead.
+        """
+        if not (batch and self.stages):
+            return batch, {}
+        if memo is not None:
+            return self._call_with_memo(batch, memo)
+        batch, removed_by = self._process(batch)
+        return batch, collections.Counter(name for name in removed_by if name is not None)
+
+    def _process(self, batch: EntryBatch) -> Tuple[EntryBatch, List[Optional[str]]]:
+        """Return the processed batch along with the name of the stage which removed each given entry, if any."""
+        removed_by: List[Optional[str]] = [None] * len(batch)
+        indexes = list(range(len(batch)))  # Indexes of the remaining entries in the given batch.
+        for stage in self.stages:
+            keep = stage.process(batch)
+            if (keep is not None) and not all(keep):
+                for index, keep_entry in zip(indexes, keep):
+                    if not keep_entry:
+                        removed_by[index] = stage.name
+                indexes = list(itertools.compress(indexes, keep))
+                batch = batch.compress(keep)
+                if not batch:
+                    break
+        return batch, removed_by
+
+    def _call_with_memo(self, batch: EntryBatch, memo: PipelineMemo) -> Tuple[EntryBatch, Dict[str, int]]:
+        """Return the processed batch along with the number of removed entries by stage name, using and updating the given memo."""
+        reads, writes = sorted(self.reads), sorted(self.writes)
+        keys = [memo.key(values) for values in zip(*(getattr(batch, field) for field in reads))] if reads else [memo.key(())] * len(batch)
+        results = [memo.get(key) for key in keys]
+
+        # Process the missing entries
+        if missing_indexes := [index for index, result in enumerate(results) if result is None]:
+            processed_batch, removed_by = self._process(batch.select(missing_indexes))
+            processed_values = iter(zip(*(getattr(processed_batch, field) for field in writes))) if writes else itertools.repeat(())
+            for index, entry_removed_by in zip(missing_indexes, removed_by):
+                results[index] = memo[keys[index]] = (entry_removed_by, () if (entry_removed_by is not None) else next(processed_values))
+
+        return self._assemble(batch, cast(List[Tuple[Optional[str], Tuple]], results), writes)
+
+    @staticmethod
+    def _assemble(batch: EntryBatch, results: List[Tuple[Optional[str], Tuple]], writes: List[str]) -> Tuple[EntryBatch, Dict[str, int]]:
+        """Return the processed batch along with the number of removed entries by stage name, using the given result of each entry."""
+        kept_indexes, kept_values = [], []
+        num_removed: Dict[str, int] = collections.Counter()
+        for index, (removed_by, values) in enumerate(results):
+            if removed_by is None:
+                kept_indexes.append(index)
+                kept_values.append(values)
+            else:
+                num_removed[removed_by] += 1
+        batch = batch.select(kept_indexes)
+        for field, column in zip(writes, zip(*kept_values)):
+            setattr(batch, field, list(column))
+        return batch, num_removed
@@ -3,6 +3,7 @@
 The supported stylers are: asterisk, irc, unicode
 """
 import logging
+from functools import lru_cache
 from typing import Any, Callable, Dict, Union
 
 import dressuplite
@@ -15,6 +16,27 @@ def _asterisk_style(text: str, **_kwargs: Any) -> str:
     return f"*{text}*"
 
 
+class _DressupTable(dict):
+    """Translation table for `str.translate` which is equivalent to `dressuplite.convert` for a unicode type.
+
+    The table is filled lazily using `dressuplite.convert` one character at a time, which is equivalent because it converts each character independently.
+    Only the public API is used, and its translator file, which it reads on every call, is read only once per new character.
+    """
+
+    def __init__(self, unicode_type: str):
+        self._unicode_type = unicode_type
+        super().__init__()
+
+    def __missing__(self, ordinal: int) -> str:
+        converted_char = self[ordinal] = dressuplite.convert(chr(ordinal), self._unicode_type)
+        return converted_char
+
+
+@lru_cache(maxsize=None)
+def _dressup_table(unicode_type: str) -> _DressupTable:
+    return _DressupTable(unicode_type)
+
+
 def _dressup_style(text: str, bold: bool = False, italics: bool = False) -> str:
     """Style the given text with the given options using `dressuplite`."""
     if not (bold or italics):
@@ -29,7 +51,7 @@ def _dressup_style(text: str, bold: bool = False, italics: bool = False) -> str:
 
     # Style
     try:
-        text = dressuplite.convert(text, unicode_type=unicode_type)
+        text = text.translate(_dressup_table(unicode_type))
     except Exception as exc:  # pylint: disable=broad-except
         log.exception(f"Error using dressuplite with {unicode_type=} to format {text!r}: {exc}")
 
@@ -1,15 +1,82 @@
 """bs4 utilities."""
+import re
 import unittest
+from html.entities import html5
+from typing import Match, Optional
 
 from bs4 import BeautifulSoup
 
+from .textwrap import shorten_to_bytes_width
 
-def html_to_text(text: str) -> str:
-    """Return extracted text from the given HTML string."""
+_ASCII_WHITESPACE = " \n\t\x0c\r"
+_CAP_CHARS_PER_BYTE = 4  # Allowance for markup when capping the input length.
+_SIMPLE_TAG = re.compile(r"""</?[A-Za-z][A-Za-z0-9-]*(?:\s+[^\s"'<>/=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'<>=`]+))?)*\s*/?>""")
+_SPECIAL_TAG = re.compile(r"<(?:script|style|template|pre|textarea)(?![A-Za-z0-9-])", re.IGNORECASE)  # Its text is excluded or its whitespace is preserved by BeautifulSoup.
+_MARKUP_START = re.compile(r"<[A-Za-z/!?]")
+_CHAR_REF = re.compile(r"&(?:([A-Za-z][A-Za-z0-9]*;)|#([0-9]+);|#[xX]([0-9a-fA-F]+);|(?=[A-Za-z0-9#]))")
+
+
+class _NotSimpleError(Exception):
+    """Error raised if the HTML is not simple enough to be converted without BeautifulSoup."""
+
+
+def _char_ref_to_text(match: Match) -> str:
+    """Return the text for a character reference match which is handled identically by BeautifulSoup."""
+    name, decimal, hexadecimal = match.groups()
+    if name:
+        if name in html5:
+            return html5[name]
+    elif codepoint := int(decimal or hexadecimal or "0", 10 if decimal else 16):
+        if (codepoint < 128) or (160 <= codepoint <= 0xD7FF) or (0xE000 <= codepoint <= 0x10FFFF):  # Excludes Windows-1252 mapped and invalid code points.
+            return chr(codepoint)
+    raise _NotSimpleError
+
+
+def _whitespace_collapsed(text: str) -> str:
+    """Return the given text, collapsing it if it has only whitespace, as is done by BeautifulSoup for a string between tags."""
+    if text and not text.strip(_ASCII_WHITESPACE):
+        return "\n" if ("\n" in text) else " "
+    return text
+
+
+def _simple_html_to_text(text: str) -> Optional[str]:
+    """Return extracted text from the given HTML string if it has only simple markup, otherwise None."""
+    if _SPECIAL_TAG.search(text):
+        return None
+    strings = _SIMPLE_TAG.split(text)
+    if _MARKUP_START.search("".join(strings)):  # e.g. due to a comment, declaration, or malformed tag
+        return None
+    try:
+        return "".join(_whitespace_collapsed(_CHAR_REF.sub(_char_ref_to_text, string) if ("&" in string) else string) for string in strings)
+    except _NotSimpleError:
+        return None
+
+
+def _bs4_html_to_text(text: str) -> str:
+    """Return extracted text from the given HTML string using BeautifulSoup."""
     # Ref: https://stackoverflow.com/a/34532382/
     return BeautifulSoup(text, features="html.parser").get_text()
 
 
+def html_to_text(text: str, max_bytes: Optional[int] = None) -> str:
+    """Return extracted text from the given HTML string.
+
+    Text without markup is returned as is, simple markup is stripped using regular expressions, and BeautifulSoup is used otherwise.
+
+    If `max_bytes` is specified, the returned text can be truncated, but only beyond its first `max_bytes` bytes after normalizing its whitespace,
+    as is done by `shorten_to_bytes_width`. This allows a long input with simple markup to be only partially processed.
+    """
+    if ("<" not in text) and ("&" not in text):
+        return _whitespace_collapsed(text)
+    if (max_bytes is not None) and (len(text) > (cap := max_bytes * _CAP_CHARS_PER_BYTE)) and (tag_match := _SIMPLE_TAG.search(text, cap)):
+        # Note: Text extracted from a prefix which has only simple markup and ends before a tag is a prefix of the text extracted from the full input.
+        if ((prefix_text := _simple_html_to_text(text[: tag_match.start()])) is not None) and (len(" ".join(prefix_text.split()).encode()) > max_bytes):
+            return prefix_text
+    if (simple_text := _simple_html_to_text(text)) is not None:
+        return simple_text
+    return _bs4_html_to_text(text)
+
+
 # pylint: disable=line-too-long,missing-class-docstring,missing-function-docstring
 class TestHtmlToText(unittest.TestCase):
     def test_examples(self):
@@ -23,5 +90,82 @@ class TestHtmlToText(unittest.TestCase):
             with self.subTest(html=html):
                 self.assertEqual(expected_text, html_to_text(html))
 
+    def test_equivalence(self):
+        fragments = [
+            "plain  text\r\n",
+            "a < b",
+            "a <",
+            "p<0.05",
+            "a <3 b",
+            "<1>",
+            "< b>",
+            "<B>X</B>",
+            "<b >x</b >",
+            "</b/>",
+            "<br/>",
+            "<br />",
+            "<img src=x alt='hi'>",
+            "<a href='x>y'>t</a>",
+            '<a href="https://example.com/?a=1&b=2">link</a>',
+            "<a\nhref=x>t</a>",
+            "<a href=x/>t",
+            "<b class=\"a\" data-x='1' hidden>y</b>",
+            "<a b/c>d</a>",
+            '<a title="x" title2="y>z</a>',
+            "<o:p>x</o:p>",
+            "<x-y>z</x-y>",
+            "<textarea><b>x</b></textarea>",
+            "<title><i>x</i></title>",
+            "&amp; &amp &ampx &foo; &#39; &#x27; &nbsp;&copy",
+            "AT&T",
+            "Q&A",
+            "R&D;",
+            "a & b",
+            "a &; b",
+            "&amp;amp;",
+            "&lt;b&gt;",
+            "&AMP; &Amp;",
+            "&lt",
+            "&notit; &notin;",
+            "&ensp;&NotEqualTilde;&nbsp",
+            "x&#8217;s",
+            "&#X41;&#0065;",
+            "&#0; &#9; &#127; &#128; &#159; &#160;",
+            "&#xD800; &#xFFFE; &#x1F600; &#x110000;",
+            "abc <!-- c --> d",
+            "abc <!-- unterminated",
+            "abc <b cla",
+            "<script>var x = '<b>'</script>y",
+            "<STYLE>p{}</STYLE>y",
+            "<template>t</template>",
+            "<![CDATA[x]]>y",
+            "<!DOCTYPE html>y",
+            "<?xml v?>y",
+            "<p>a<p>b</div>c",
+            "x\x00y",
+            "☺ — “quoted”",
+            "  ",
+        ]
+        corpus = fragments + [f"{f1}{f2}" for f1 in fragments for f2 in fragments[::7]] + ["".join(fragments) * 20]
+        for html in corpus:
+            with self.subTest(html=html):
+                self.assertEqual(_bs4_html_to_text(html), html_to_text(html))
+
+    def test_max_bytes(self):
+        paragraph = "<p>Some <b>bold</b> &amp; <a href='https://example.com/?a=1&amp;b=2'>linked</a> text.</p>\n"
+        corpus = [
+            paragraph * 100,
+            "<div>" + "<img src=x>" * 1_000 + "</div>" + paragraph * 10,
+            paragraph * 50 + "<!-- comment -->" + paragraph * 50,
+            "<!-- c -->" + paragraph * 100,
+        ]
+        for html in corpus:
+            for max_bytes in (10, 100, 509):
+                with self.subTest(html=html[:20], max_bytes=max_bytes):
+                    expected_text = _bs4_html_to_text(html)
+                    actual_text = html_to_text(html, max_bytes=max_bytes)
+                    self.assertEqual(shorten_to_bytes_width(expected_text, max_bytes), shorten_to_bytes_width(actual_text, max_bytes))
+                    self.assertTrue(expected_text.startswith(actual_text))
+
 
 # python -m unittest -v ircrssfeedbot.util.bs4
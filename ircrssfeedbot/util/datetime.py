@@ -1,6 +1,11 @@
 """datetime utilities."""
-from datetime import timedelta
-from typing import Union
+import calendar
+import email.utils
+import math
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Union, cast
 
 
 def timedelta_desc(seconds: Union[int, float, timedelta]) -> str:
@@ -8,3 +13,61 @@ def timedelta_desc(seconds: Union[int, float, timedelta]) -> str:
     if isinstance(seconds, timedelta):
         seconds = seconds.total_seconds()
     return str(timedelta(seconds=round(seconds)))
+
+
+def timestamp(value: Any) -> Optional[float]:
+    """Return the POSIX timestamp of the given date and time if it is parseable, otherwise None.
+
+    The value can be a POSIX timestamp, a `time.struct_time` in UTC as produced by `feedparser`, a `datetime`,
+    or a string in ISO 8601 or RFC 2822 format.
+    A `datetime` or string without a timezone is assumed to be in UTC.
+    """
+    try:
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return float(value) if math.isfinite(value) else None
+        if isinstance(value, time.struct_time):
+            return float(calendar.timegm(value))
+        if isinstance(value, str):
+            if not (value := value.strip()):
+                return None
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                value = email.utils.parsedate_to_datetime(cast(str, value))
+        if isinstance(value, datetime):
+            return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    except (TypeError, ValueError, OverflowError, OSError):
+        pass
+    return None
+
+
+# pylint: disable=missing-class-docstring,missing-function-docstring
+class TestTimestamp(unittest.TestCase):
+    def test_examples(self):
+        expected_timestamp = 1630939500.0  # 2021-09-06T14:45:00Z
+        examples = {
+            "Mon, 06 Sep 2021 16:45:00 +0200": expected_timestamp,
+            "2021-09-06T14:45:00Z": expected_timestamp,
+            "2021-09-06T16:45:00+02:00": expected_timestamp,
+            "2021-09-06 14:45:00": expected_timestamp,
+            " 2021-09-06T14:45:00.000Z ": expected_timestamp,
+            "2021-09-06": 1630886400.0,
+            expected_timestamp: expected_timestamp,
+            int(expected_timestamp): expected_timestamp,
+            time.gmtime(expected_timestamp): expected_timestamp,
+            datetime(2021, 9, 6, 14, 45): expected_timestamp,
+            "": None,
+            "yesterday": None,
+            "Mon, 99 Foo 2021": None,
+            float("nan"): None,
+            True: None,
+            None: None,
+        }
+        for value, expected in examples.items():
+            with self.subTest(value=value):
+                self.assertEqual(expected, timestamp(value))
+
+
+# python -m unittest -v ircrssfeedbot.util.datetime
@@ -3,11 +3,14 @@ import functools
 import hashlib
 import random
 import string
+import struct
 import unittest
 from typing import Dict, List, Union
 
 from ..config import CACHE_MAXSIZE__INT8HASH
 
+_INT8_UNPACK = struct.Struct(">q").unpack  # Big-endian signed 8 byte integer, as by int.from_bytes(..., byteorder="big", signed=True).
+
 
 def hash4(content: Union[bytes, str]) -> str:
     """Return a 4 byte hash encoded as a hex string."""
@@ -17,7 +20,10 @@ def hash4(content: Union[bytes, str]) -> str:
 
 
 class Int8Hash:
-    """8 byte signed integer hash of string."""
+    """8 byte signed integer hash of string.
+
+    The hash is persisted in the database, and so it must never be changed.
+    """
 
     BYTES = 8
     BITS = BYTES * 8
@@ -28,22 +34,30 @@ class Int8Hash:
     @classmethod
     def as_dict(cls, texts: List[str]) -> Dict[int, str]:
         """Return a mapping of integer hashes corresponding to the given list of strings."""
-        return {cls.as_int(text): text for text in texts}  # Intentionally Dict[int, str], not Dict[str, int].
+        return dict(zip(cls.as_list(texts), texts))  # Intentionally Dict[int, str], not Dict[str, int].
 
     @classmethod
     @functools.lru_cache(CACHE_MAXSIZE__INT8HASH)
     def as_int(cls, text: str) -> int:
-        """Return an integer hash of a string."""
-        seed = text.encode()
-        hash_digest = hashlib.shake_128(seed).digest(cls.BYTES)  # pylint: disable=too-many-function-args
-        hash_int = int.from_bytes(hash_digest, byteorder="big", signed=True)
-        assert cls.MIN <= hash_int <= cls.MAX
-        return hash_int
+        """Return an integer hash of a string.
+
+        This is cached, and is intended for strings which are hashed repeatedly, such as channel and feed names.
+        """
+        return cls.as_uncached_int(text)
 
     @classmethod
     def as_list(cls, texts: List[str]) -> List[int]:
-        """Return a list of integer hashes corresponding to the given list of strings."""
-        return [cls.as_int(text) for text in texts]
+        """Return a list of integer hashes corresponding to the given list of strings.
+
+        This is not cached, and is intended for URLs, which are too many to cache.
+        """
+        shake_128, num_bytes = hashlib.shake_128, cls.BYTES
+        return [_INT8_UNPACK(shake_128(text.encode()).digest(num_bytes))[0] for text in texts]  # pylint: disable=too-many-function-args
+
+    @classmethod
+    def as_uncached_int(cls, text: str) -> int:
+        """Return an integer hash of a string without caching it."""
+        return _INT8_UNPACK(hashlib.shake_128(text.encode()).digest(cls.BYTES))[0]  # pylint: disable=too-many-function-args
 
 
 # pylint: disable=missing-class-docstring,missing-function-docstring
@@ -56,6 +70,21 @@ class TestInt8Hash(unittest.TestCase):
             int8 = Int8Hash.as_int(text)
             self.assertLessEqual(Int8Hash.MIN, int8)
             self.assertGreaterEqual(Int8Hash.MAX, int8)
+            self.assertEqual(int8, int.from_bytes(hashlib.shake_128(text.encode()).digest(8), byteorder="big", signed=True))  # pylint: disable=too-many-function-args
+
+    def test_batch(self):
+        texts = [f"https://example.com/{i}" for i in range(1_000)] + ["", "é"]
+        hashes = Int8Hash.as_list(texts)
+        self.assertEqual(hashes, [Int8Hash.as_int(text) for text in texts])
+        self.assertEqual(hashes, [Int8Hash.as_uncached_int(text) for text in texts])
+        self.assertEqual(Int8Hash.as_dict(texts + texts[:1]), dict(zip(hashes, texts)))
+
+    def test_collisions(self):
+        num_texts, num_bits = 100_000, 24  # The expected number of collisions of the truncated hashes is num_texts**2 / 2**(num_bits + 1), i.e. about 298.
+        hashes = Int8Hash.as_list([f"https://example.com/article/{i}" for i in range(num_texts)])
+        self.assertEqual(len(set(hashes)), num_texts)
+        num_collisions = num_texts - len({h >> (Int8Hash.BITS - num_bits) for h in hashes})
+        self.assertAlmostEqual(num_collisions, num_texts**2 / 2 ** (num_bits + 1), delta=60)
 
 
 # python -m unittest -v ircrssfeedbot.util.hashlib
@@ -0,0 +1,190 @@
+"""re utilities."""
+import logging
+import re
+import unittest
+from re import _constants as sre_constants  # type: ignore
+from re import _parser as sre_parse  # type: ignore
+from typing import Dict, Iterable, List, Optional, Pattern, Set
+
+log = logging.getLogger(__name__)
+
+_IGNORECASE_TRANSLATION = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})  # Non-ASCII characters which re.IGNORECASE matches to ASCII letters but str.lower does not map to them.
+_LITERAL_LEN_MAX = 32
+
+
+def required_literal(pattern: Pattern) -> str:
+    """Return a literal substring which any match of the given compiled pattern must contain, or an empty string if none is found.
+
+    If the pattern ignores case, the returned literal is lowercase ASCII, and it must be searched for in text which is transformed by `ignorecase_text`.
+    """
+    ignorecase = pattern.flags & re.IGNORECASE
+    literals, literal = [], ""
+    for opcode, arg in sre_parse.parse(pattern.pattern, pattern.flags):  # Only top-level items are always required.
+        if (opcode is sre_constants.LITERAL) and not (ignorecase and (arg > 127)):  # pylint: disable=no-member
+            literal += chr(arg)
+        else:
+            literals.append(literal)
+            literal = ""
+    literals.append(literal)
+    literal = max(literals, key=len)[:_LITERAL_LEN_MAX]  # A prefix of a required literal is also required.
+    return literal.lower() if ignorecase else literal
+
+
+def ignorecase_text(text: str) -> str:
+    """Return the given text transformed for searching a case-insensitive literal returned by `required_literal`."""
+    return text.translate(_IGNORECASE_TRANSLATION).lower()
+
+
+def _trie_regex(literals: Iterable[str]) -> str:
+    """Return a regular expression which matches the longest of the given nonempty literals at a position."""
+    trie: Dict = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of literal.
+
+    def _regex(node: Dict) -> str:
+        alternatives = [re.escape(char) + _regex(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ""
+        regex = alternatives[0] if (len(alternatives) == 1) else f"(?:{'|'.join(alternatives)})"
+        return f"(?:{regex})?" if ("" in node) else regex
+
+    return _regex(trie)
+
+
+class _LiteralFinder:
+    """Finder of the given literals in a text, including overlapping ones."""
+
+    def __init__(self, literals: Set[str]):
+        self._literals = literals
+        self._lengths = sorted({len(literal) for literal in literals})
+        self._regex = re.compile(_trie_regex(literals)) if literals else None
+
+    def __call__(self, text: str) -> Set[str]:
+        """Return the literals found in the given text."""
+        found: Set[str] = set()
+        if self._regex is None:
+            return found
+        pos = 0
+        while match := self._regex.search(text, pos):
+            longest = match.group()  # Literals which are shorter prefixes of it also match.
+            found.update(prefix for n in self._lengths if (n <= len(longest)) and ((prefix := longest[:n]) in self._literals))
+            pos = match.start() + 1
+        return found
+
+
+class MultiPattern:
+    """Ordered regular expression patterns which are searched together.
+
+    A required literal of each pattern is used as a prefilter, so as to search only the patterns whose literal is found in the text.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[Pattern] = [re.compile(p) for p in patterns]
+        self._unfiltered: List[int] = []  # Indexes of patterns without a literal.
+        self._indexes_by_literal: Dict[bool, Dict[str, List[int]]] = {False: {}, True: {}}  # By whether the literal ignores case.
+        for index, pattern in enumerate(self.patterns):
+            if literal := required_literal(pattern):
+                self._indexes_by_literal[bool(pattern.flags & re.IGNORECASE)].setdefault(literal, []).append(index)
+            else:
+                self._unfiltered.append(index)
+        self._find_literals = {ignorecase: _LiteralFinder(set(indexes)) for ignorecase, indexes in self._indexes_by_literal.items()}
+        log.debug(f"Prefiltering {len(self.patterns) - len(self._unfiltered)} out of {len(self.patterns)} patterns using their required literals.")
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _candidate_indexes(self, text: str) -> Set[int]:
+        """Return the indexes of the patterns which can match the given text."""
+        indexes = set(self._unfiltered)
+        for ignorecase, find_literals in self._find_literals.items():
+            indexes_by_literal = self._indexes_by_literal[ignorecase]
+            for literal in find_literals(ignorecase_text(text) if ignorecase else text):
+                indexes.update(indexes_by_literal[literal])
+        return indexes
+
+    def search(self, *texts: str) -> Optional[Pattern]:
+        """Return the first pattern in order which matches any of the given texts, if any."""
+        if not self.patterns:
+            return None
+        candidate_indexes: Set[int] = set()
+        for text in texts:
+            candidate_indexes |= self._candidate_indexes(text)
+        for index in sorted(candidate_indexes):
+            pattern = self.patterns[index]
+            for text in texts:
+                if pattern.search(text):
+                    return pattern
+        return None
+
+
+# pylint: disable=missing-class-docstring,missing-function-docstring
+class TestRequiredLiteral(unittest.TestCase):
+    def test_examples(self):
+        examples = {
+            "foo": "foo",
+            r"\bfoo\b": "foo",
+            r"(?i)\bFoo Bar\b": "foo bar",
+            "ab+cdef": "cdef",
+            "ab?c": "a",
+            "foo|barbaz": "",
+            "(foo)": "",
+            "[a-z]+": "",
+            "(?i)éa": "a",
+            "(?x) f o o ": "foo",
+            "x" * 100: "x" * _LITERAL_LEN_MAX,
+        }
+        for pattern, expected_literal in examples.items():
+            with self.subTest(pattern=pattern):
+                self.assertEqual(expected_literal, required_literal(re.compile(pattern)))
+
+
+class TestMultiPattern(unittest.TestCase):
+    def test_search(self):
+        multi_pattern = MultiPattern(["foo", r"\bbar\b", "(?P<name>ba)z", "qux|quux", "ab", "abc", "bcd"])
+        self.assertEqual(7, len(multi_pattern))
+        self.assertIsNone(multi_pattern.search("qu", "barn"))
+        self.assertEqual("foo", multi_pattern.search("a food").pattern)  # type: ignore
+        self.assertEqual(r"\bbar\b", multi_pattern.search("qu", "a bar").pattern)  # type: ignore
+        self.assertEqual("(?P<name>ba)z", multi_pattern.search("baz").pattern)  # type: ignore
+        self.assertEqual("qux|quux", multi_pattern.search("quux").pattern)  # type: ignore
+        self.assertEqual("ab", multi_pattern.search("xabcd").pattern)  # type: ignore
+        self.assertEqual("bcd", multi_pattern.search("xbcd").pattern)  # type: ignore
+
+    def test_order(self):
+        patterns = ["abc", "b", "a"]
+        multi_pattern = MultiPattern(patterns)
+        for text, expected_pattern in {"abc": "abc", "cba": "b", "ca": "a"}.items():
+            with self.subTest(text=text):
+                self.assertEqual(expected_pattern, multi_pattern.search(text).pattern)  # type: ignore
+
+    def test_empty(self):
+        multi_pattern = MultiPattern([])
+        self.assertFalse(multi_pattern)
+        self.assertIsNone(multi_pattern.search("foo"))
+
+    def test_ignorecase(self):
+        multi_pattern = MultiPattern(["(?i)foo", "bar", "(?i)sin", "(?i)k"])
+        self.assertEqual("(?i)foo", multi_pattern.search("FoO").pattern)  # type: ignore
+        self.assertIsNone(multi_pattern.search("BAR"))
+        for text in ("SIN", "ſİN", "ſın"):
+            with self.subTest(text=text):
+                self.assertEqual("(?i)sin", multi_pattern.search(text).pattern)  # type: ignore
+        self.assertEqual("(?i)k", multi_pattern.search("\u212a").pattern)  # type: ignore
+
+    def test_equivalence(self):
+        patterns = [r"(?i)\bw[aeiou]rd\d\b", "word1", "(?i)WORD2", "ord3$", r"(\w)\1", "(?s)d.w"]
+        multi_pattern = MultiPattern(patterns)
+        compiled_patterns = [re.compile(p) for p in patterns]
+        for text in ("word1 word2", "WORD3", "ward4", "Word2x", "xord3", "aa", "d\nword", "ıſ", ""):
+            with self.subTest(text=text):
+                expected_pattern = next((p for p in compiled_patterns if p.search(text)), None)
+                self.assertEqual(expected_pattern, multi_pattern.search(text))
+
+
+# python -m unittest -v ircrssfeedbot.util.re
@@ -4,7 +4,6 @@ import unittest
 
 _MIN_WIDTH = 5  # == len(textwrap.shorten(string.ascii_letters, len(string.ascii_letters) - 1)) == len('[...]')
 _RE_COMBINE_WHITESPACE = re.compile(r"(?a:\s+)")
-_RE_STRIP_WHITESPACE = re.compile(r"(?a:^\s+|\s+$)")
 
 
 def shorten_to_bytes_width(string: str, maximum_bytes: int) -> str:
@@ -18,8 +17,7 @@ def shorten_to_bytes_width(string: str, maximum_bytes: int) -> str:
 
     # Get the UTF-8 bytes that represent the string and normalize the spaces.
     # Ref: https://stackoverflow.com/a/2077906/
-    string = _RE_COMBINE_WHITESPACE.sub(" ", string)
-    string = _RE_STRIP_WHITESPACE.sub("", string)
+    string = _RE_COMBINE_WHITESPACE.sub(" ", string).strip(" ")  # Note: Stripping using a regex is slow for long strings having many spaces.
     encoded_string = string.encode()
 
     # If the input string is empty simply return an empty string.
@@ -50,5 +48,9 @@ class TestShortener(unittest.TestCase):
     def test_stylized_irc_text(self):
         self.assertEqual(shorten_to_bytes_width("\x1dzzz\x0f " * 100, 20), "\x1dzzz\x0f \x1dzzz\x0f [...]")
 
+    def test_whitespace(self):
+        self.assertEqual(shorten_to_bytes_width(" \t a \n\r\x0b\x0c b\u3000 ", 20), "a b\u3000")
+        self.assertEqual(shorten_to_bytes_width(" \t\n ", 20), "")
+
 
 # python -m unittest -v ircrssfeedbot.util.textwrap
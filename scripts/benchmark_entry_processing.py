@@ -0,0 +1,84 @@
+"""Benchmark the processing of the entries of a synthetic feed by its feed reader.
+
+CLI example: python -m scripts.benchmark_entry_processing
+"""
+
+# pylint: disable=invalid-name,protected-access
+
+import logging
+import tempfile
+import timeit
+from pathlib import Path
+from typing import List
+
+from ircrssfeedbot import config
+from ircrssfeedbot.db import Database
+from ircrssfeedbot.entry import EntryBatch, RawFeedEntry
+from ircrssfeedbot.feed import FeedReader
+from ircrssfeedbot.pipeline import PipelineMemo
+
+# Customize:
+NUM_ENTRIES = 1_000
+NUM_REPEATS = 5
+POSTED_FRACTION = 0.95
+FEED_CONFIG = {
+    "url": "https://example.com/feed.xml",
+    "blacklist": {"title": [f"(?i)\\bspam{i}\\b" for i in range(20)], "url": ["/sponsored/"]},
+    "https": True,
+    "www": False,
+    "emoji": False,
+    "sub": {"title": {"pattern": "^\\[[^]]+\\] ", "repl": ""}, "url": {"pattern": "\\?utm_source=.+$", "repl": ""}},
+    "format": {"re": {"url": "/article/(?P<id>\\d+)"}, "str": {"title": "{title} (#{id})"}},
+}
+
+logging.getLogger(config.PACKAGE_NAME).setLevel(logging.WARNING)
+config.INSTANCE = {"dir": Path(tempfile.mkdtemp()), "feeds": {"#channel": {"feed": FEED_CONFIG}}, "defaults": config.FEED_DEFAULTS}
+feed_reader = FeedReader(channel="#channel", name="feed", irc=None, db=Database(), url_reader=None, url_shortener=None, publishers=None)  # type: ignore
+raw_entries: List[RawFeedEntry] = [
+    RawFeedEntry(
+        {
+            "title": f"[News] Article {i} about <b>something</b> 🚀 important.",
+            "link": f"http://www.example.com/article/{i}?utm_source=rss",
+            "summary": f"<p>Summary of article {i} with <a href='https://example.com'>a link</a> and more text.</p>" * 5,
+            "category": [f"category{i % 10}"],
+        }
+    )
+    for i in range(NUM_ENTRIES)
+]
+
+
+def new_entries() -> EntryBatch:
+    """Return a freshly created batch of entries."""
+    return EntryBatch.from_raw_entries(raw_entries)
+
+
+def clear_memos() -> None:
+    """Replace the pipeline memos of the feed reader with empty ones."""
+    feed_reader.url_pipeline_memo, feed_reader.text_pipeline_memo = PipelineMemo(repr(feed_reader.config)), PipelineMemo(repr(feed_reader.config))
+
+
+processed_entries, _ = feed_reader._process_entries(new_entries())
+posted_urls = [e.long_url for e in processed_entries[: int(len(processed_entries) * POSTED_FRACTION)]]
+print(f"Using pipeline: {feed_reader.pipeline}\nIt is split into URL pipeline: {feed_reader.url_pipeline}\nand text pipeline: {feed_reader.text_pipeline}")
+for memo in ("cold", "warm"):
+    setup = clear_memos if (memo == "cold") else (lambda: None)
+    seconds = min(timeit.repeat(lambda: feed_reader._process_entries(new_entries()), setup=setup, number=1, repeat=NUM_REPEATS))
+    print(f"Processed {NUM_ENTRIES:,} unposted entries with a {memo} memo in {seconds * 1000:.1f}ms ({NUM_ENTRIES / seconds:,.0f} entries/s).")
+feed_reader.db.insert_posted(feed_reader.channel, feed_reader.name, posted_urls)
+for memo in ("cold", "warm"):
+    setup = clear_memos if (memo == "cold") else (lambda: None)
+    seconds = min(timeit.repeat(lambda: feed_reader._process_entries(new_entries()), setup=setup, number=1, repeat=NUM_REPEATS))
+    _, num_posted = feed_reader._process_entries(new_entries())
+    print(
+        f"Processed {NUM_ENTRIES:,} entries of which {num_posted:,} were posted and skipped the text pipeline "
+        f"with a {memo} memo in {seconds * 1000:.1f}ms ({NUM_ENTRIES / seconds:,.0f} entries/s)."
+    )
+
+print("Time by stage:")
+batch = new_entries()
+for stage in feed_reader.pipeline.stages:
+    batch_copies = [batch.select(range(len(batch))) for _ in range(NUM_REPEATS)]  # Stages update batches in place.
+    seconds = min(timeit.timeit(lambda b=b, process=stage.process: process(b), number=1) for b in batch_copies)  # type: ignore
+    print(f"{stage.name}: {seconds * 1000:.1f}ms")
+    if (keep := stage.process(batch)) is not None:
+        batch = batch.compress(keep)
@@ -0,0 +1,66 @@
+"""Benchmark the same extraction from a large HTML page using the `hext`, `xpath`, and `css` parsers.
+
+Usage:
+Optionally customize PATH below to use a saved HTML page along with matching selectors.
+Otherwise, a synthetic page is used.
+
+CLI example: python -m scripts.benchmark_html_parsers
+"""
+
+# pylint: disable=invalid-name
+
+import timeit
+from pathlib import Path
+from typing import Dict, Type
+
+from ircrssfeedbot.parsers import css, hext, xpath
+from ircrssfeedbot.parsers._base import BaseParser
+
+# Customize:
+PATH = ""
+NUM_SYNTHETIC_ARTICLES = 5_000
+NUM_REPEATS = 3
+SELECTORS = {
+    "hext": """
+<article class="post">
+    <h2><a href:link @text:title /></h2>
+    <p class="summary" @text:summary />
+</article>
+""",
+    "xpath": """
+//article[@class="post"]
+title: ./h2/a
+link: ./h2/a/@href
+summary: ./p[@class="summary"]
+""",
+    "css": """
+article.post
+title: h2 > a
+link: h2 > a @href
+summary: p.summary
+""",
+}
+
+if PATH:
+    content = Path(PATH).read_bytes()
+else:
+    articles = "".join(
+        f'<article class="post"><h2><a href="https://example.com/article/{i}">Article {i} ☺</a></h2>'
+        f'<div class="meta"><span>By Author {i % 100}</span><time>2022-12-{1 + i % 28:02}</time></div>'
+        f'<p class="summary">{"Some summary text. " * 10}</p><ul>{"<li>related</li>" * 5}</ul></article>'
+        for i in range(NUM_SYNTHETIC_ARTICLES)
+    )
+    content = f'<html><head><meta charset="utf-8"><title>Page</title></head><body><main>{articles}</main></body></html>'.encode()
+print(f"Page has {len(content):,} bytes.")
+
+parsers: Dict[str, Type[BaseParser]] = {"hext": hext.Parser, "xpath": xpath.Parser, "css": css.Parser}
+results = {}
+for name, Parser in parsers.items():
+    results[name] = Parser(selector=SELECTORS[name], follower=None, content=content).entries
+    statement = lambda Parser=Parser, selector=SELECTORS[name]: Parser(selector=selector, follower=None, content=content).entries
+    seconds = min(timeit.repeat(statement, number=1, repeat=NUM_REPEATS))
+    print(f"{name}: {seconds:.3f}s for {len(results[name]):,} entries")
+
+for name, entries in results.items():
+    if [(e.title, e.link) for e in entries] != [(e.title, e.link) for e in results["hext"]]:
+        print(f"Warning: The entries of {name} differ from those of hext.")
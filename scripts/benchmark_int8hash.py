@@ -0,0 +1,72 @@
+"""Benchmark the hashing throughput of Int8Hash, and count the collisions of its full and truncated hashes of synthetic URLs versus their expected number.
+
+CLI example: python -m scripts.benchmark_int8hash
+"""
+
+# pylint: disable=invalid-name
+
+import array
+import hashlib
+import math
+import timeit
+from typing import Callable, Dict, List
+
+from ircrssfeedbot.util.hashlib import Int8Hash
+from ircrssfeedbot.util.timeit import Timer
+
+# Customize:
+NUM_URLS_THROUGHPUT = 100_000
+NUM_URLS_CACHED = 1_000
+NUM_URLS_COLLISIONS = 100_000_000
+NUM_BITS_COLLISIONS = (32, 40, 48, 64)
+NUM_REPEATS = 3
+CHUNK_SIZE = 100_000
+URL_FORMAT = "https://example.com/news/{}/some-article-title?utm_source=rss"
+
+
+def _as_list_using_blake2b(texts: List[str]) -> List[int]:
+    """Return the 8 byte signed integer blake2b hashes of the given strings, as a reference for a faster hash."""
+    return [int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), byteorder="big", signed=True) for text in texts]
+
+
+def _as_list_using_uncached_as_int(texts: List[str]) -> List[int]:
+    """Return the hashes of the given strings using `Int8Hash.as_int` while missing its cache."""
+    Int8Hash.as_int.cache_clear()  # pylint: disable=no-member
+    return [Int8Hash.as_int(text) for text in texts]
+
+
+# Benchmark throughput
+urls = [URL_FORMAT.format(i) for i in range(NUM_URLS_THROUGHPUT)]
+cached_urls = urls[:NUM_URLS_CACHED]
+Int8Hash.as_list(cached_urls)
+hashers: Dict[str, Callable[[], List[int]]] = {
+    "as_int having cache misses": lambda: _as_list_using_uncached_as_int(urls),
+    f"as_int having cache hits for {NUM_URLS_CACHED:,} URLs": lambda: [Int8Hash.as_int(url) for url in cached_urls],
+    "as_uncached_int": lambda: [Int8Hash.as_uncached_int(url) for url in urls],
+    "as_list": lambda: Int8Hash.as_list(urls),
+    "blake2b for reference": lambda: _as_list_using_blake2b(urls),
+}
+for name, hasher in hashers.items():
+    num_urls = len(hasher())
+    seconds = min(timeit.repeat(hasher, number=1, repeat=NUM_REPEATS))
+    print(f"Hashed {num_urls:,} URLs using {name} in {seconds * 1000:.1f}ms ({num_urls / seconds:,.0f} URLs/s).")
+del urls
+
+# Count collisions
+timer = Timer()
+buckets = [array.array("q") for _ in range(256)]  # Keyed by the highest 8 bits of the hash, so that each bucket is sortable separately.
+for start in range(0, NUM_URLS_COLLISIONS, CHUNK_SIZE):
+    for url_hash in Int8Hash.as_list([URL_FORMAT.format(i) for i in range(start, min(start + CHUNK_SIZE, NUM_URLS_COLLISIONS))]):
+        buckets[(url_hash >> 56) + 128].append(url_hash)
+print(f"Hashed {NUM_URLS_COLLISIONS:,} URLs in {timer}.")
+num_collisions = dict.fromkeys(NUM_BITS_COLLISIONS, 0)
+for bucket in buckets:
+    sorted_hashes = sorted(bucket)
+    for num_bits in NUM_BITS_COLLISIONS:
+        shift = Int8Hash.BITS - num_bits
+        num_collisions[num_bits] += sum((h1 >> shift) == (h2 >> shift) for h1, h2 in zip(sorted_hashes, sorted_hashes[1:]))
+    del bucket[:]  # Frees memory.
+for num_bits, num_bits_collisions in num_collisions.items():
+    num_values = 2**num_bits
+    num_expected = NUM_URLS_COLLISIONS + num_values * math.expm1(-NUM_URLS_COLLISIONS / num_values)  # The expected number of hashes which equal a preceding hash.
+    print(f"Found {num_bits_collisions:,} collisions out of {NUM_URLS_COLLISIONS:,} URLs using the highest {num_bits} bits of the hash versus {num_expected:,.4f} expected.")
@@ -0,0 +1,49 @@
+"""Benchmark the rendering of the messages of the entries of a synthetic feed for its channel and a mirror channel.
+
+CLI example: python -m scripts.benchmark_message_rendering
+"""
+
+# pylint: disable=invalid-name
+
+import logging
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Dict
+
+from ircrssfeedbot import config
+from ircrssfeedbot.entry import FeedEntry
+from ircrssfeedbot.feed import FeedReader
+
+# Customize:
+NUM_ENTRIES = 1_000
+NUM_REPEATS = 5
+CHANNEL = "#channel"
+MIRROR_CHANNEL = "##mirror"
+FEED_CONFIGS: Dict[str, Dict] = {
+    "plain": {},
+    "summary": {"message": {"summary": True}},
+    "styled_summary": {"message": {"summary": True}, "style": {"name": {"bg": "blue", "fg": "white", "bold": True}}},
+}
+
+logging.getLogger(config.PACKAGE_NAME).setLevel(logging.WARNING)
+config.runtime.identity = "bot!~bot@example.com"
+feeds = {name: {**feed_config, "url": f"https://example.com/{name}.xml"} for name, feed_config in FEED_CONFIGS.items()}
+config.INSTANCE = {"dir": Path(tempfile.mkdtemp()), "feeds": {CHANNEL: feeds}, "defaults": config.FEED_DEFAULTS}
+
+for name in feeds:
+    feed_reader = FeedReader(channel=CHANNEL, name=name, irc=None, db=None, url_reader=None, url_shortener=None, publishers=None)  # type: ignore
+    entries = [
+        FeedEntry(
+            title=f"Article {i} about something which is important, and having a title that is long enough to be realistic",
+            long_url=f"https://example.com/article/{i}",
+            summary=f"Summary of article {i} with some more text. " * 20,
+            categories=[],
+            data={},
+            feed_reader=feed_reader,
+        )
+        for i in range(NUM_ENTRIES)
+    ]
+    for channel in (CHANNEL, MIRROR_CHANNEL):
+        seconds = min(timeit.repeat(lambda c=channel, es=entries: [e.message(c) for e in es], number=1, repeat=NUM_REPEATS))  # type: ignore
+        print(f"Rendered {NUM_ENTRIES:,} messages of feed {name} for {channel} in {seconds * 1000:.1f}ms ({NUM_ENTRIES / seconds:,.0f} messages/s).")
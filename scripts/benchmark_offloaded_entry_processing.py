@@ -0,0 +1,86 @@
+"""Benchmark many concurrent feed reads with and without offloading entry processing to the worker processes.
+
+The CPU time used by the main process is reported, it being the process whose threads contend for one GIL.
+
+CLI example: python -m scripts.benchmark_offloaded_entry_processing
+"""
+
+# pylint: disable=invalid-name
+
+import concurrent.futures
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from ircrssfeedbot import config
+from ircrssfeedbot.db import Database
+from ircrssfeedbot.feed import FeedReader
+from ircrssfeedbot.url import URLContent
+
+# Customize:
+NUM_FEEDS = 16
+NUM_ENTRIES = 500
+NUM_REPEATS = 3
+FEED_CONFIG = {
+    "blacklist": {"title": [f"(?i)\\bspam{i}\\b" for i in range(20)], "url": ["/sponsored/"]},
+    "https": True,
+    "www": False,
+    "emoji": False,
+    "sub": {"title": {"pattern": "^\\[[^]]+\\] ", "repl": ""}, "url": {"pattern": "\\?utm_source=.+$", "repl": ""}},
+    "message": {"summary": True},
+}
+
+
+class URLReader:
+    """Reader of synthetic feed content."""
+
+    def __init__(self, contents: Dict[str, bytes]):
+        self._contents = contents
+
+    def __getitem__(self, url: str) -> URLContent:
+        return URLContent(self._contents[url], None, URLContent.Approach.READ)
+
+
+def rss(feed_index: int) -> bytes:
+    """Return the content of a synthetic RSS feed."""
+    items = "".join(
+        f"<item><title>[News] Article {i} of {feed_index} about &lt;b&gt;something&lt;/b&gt; 🚀 important.</title>"
+        f"<link>http://www.example.com/{feed_index}/article/{i}?utm_source=rss</link>"
+        f"<description>{'&lt;p&gt;Summary with &lt;a href=&quot;https://example.com&quot;&gt;a link&lt;/a&gt; and more text.&lt;/p&gt;' * 5}</description></item>"
+        for i in range(NUM_ENTRIES)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {feed_index}</title>{items}</channel></rss>'.encode()
+
+
+logging.getLogger(config.PACKAGE_NAME).setLevel(logging.WARNING)
+urls = [f"https://example.com/feed{i}.xml" for i in range(NUM_FEEDS)]
+url_reader = URLReader({url: rss(i) for i, url in enumerate(urls)})
+feeds = {
+    f"feed{i}{'_offloaded' * offload}": {**FEED_CONFIG, "url": url, "offload": offload} for i, url in enumerate(urls) for offload in (False, True)
+}  # Note: The offloaded feeds are separate, so their entries are likewise unposted.
+config.INSTANCE = {"dir": Path(tempfile.mkdtemp()), "feeds": {"#channel": feeds}, "defaults": config.FEED_DEFAULTS}
+db = Database()
+
+
+def read_feeds(offload: bool) -> None:
+    """Read the feeds concurrently using new feed readers."""
+    feed_readers = [
+        FeedReader(channel="#channel", name=name, irc=None, db=db, url_reader=url_reader, url_shortener=None, publishers=None)  # type: ignore
+        for name, feed_config in feeds.items()
+        if feed_config["offload"] is offload
+    ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(feed_readers)) as executor:
+        list(executor.map(FeedReader.read, feed_readers))
+
+
+read_feeds(offload=False)  # Creates the worker pool.
+for is_offloaded in (False, True):
+    results = []
+    for _ in range(NUM_REPEATS):
+        start_time, start_cpu_time = time.perf_counter(), time.process_time()
+        read_feeds(is_offloaded)
+        results.append((time.process_time() - start_cpu_time, time.perf_counter() - start_time))
+    cpu_seconds, seconds = min(results)
+    print(f"Offload={is_offloaded}: Read {NUM_FEEDS} feeds of {NUM_ENTRIES:,} entries each concurrently in {seconds:.2f}s using {cpu_seconds:.2f}s of main process CPU time.")
@@ -0,0 +1,55 @@
+"""Benchmark the conversion of a large CSV to raw entries by the `pandas` parser.
+
+CLI example: python -m scripts.benchmark_pandas_parser
+"""
+
+# pylint: disable=invalid-name
+
+import io
+import timeit
+
+import pandas as pd
+
+from ircrssfeedbot.entry import RawFeedEntry
+from ircrssfeedbot.parsers import pandas as pandas_parser
+
+# Customize:
+NUM_ROWS = 50_000
+NUM_REPEATS = 3
+SELECTOR = "read_csv(file)"
+
+df = pd.DataFrame(
+    {
+        "title": [f"Title of article {i} about a topic" for i in range(NUM_ROWS)],
+        "link": [f"https://www.ncbi.nlm.nih.gov/pubmed/{30_000_000 + i}" for i in range(NUM_ROWS)],
+        "summary": [f"Summary {i} " * 20 for i in range(NUM_ROWS)],
+        "category": [f"category{i % 50}" for i in range(NUM_ROWS)],
+        "journal": [f"Journal {i % 500}" for i in range(NUM_ROWS)],
+        "date": [f"2020-{1 + i % 12:02}-{1 + i % 28:02}" for i in range(NUM_ROWS)],
+        "pmid": range(30_000_000, 30_000_000 + NUM_ROWS),
+    }
+)
+content = df.to_csv(index=False).encode()
+print(f"CSV has {NUM_ROWS:,} rows, {len(df.columns)} columns, and {len(content):,} bytes.")
+
+
+def iterrows() -> None:
+    """Convert using the previous approach."""
+    df_ = pd.read_csv(io.BytesIO(content))
+    _ = [RawFeedEntry(dict(e)) for _, e in df_.iterrows()]
+
+
+raw_keys = RawFeedEntry.raw_keys(RawFeedEntry.PROPERTY_KEYS.keys())
+benchmarks = {
+    "iterrows (previous)": iterrows,
+    "to_dict records": lambda: pandas_parser.Parser(selector=SELECTOR, follower=None, content=content).entries,
+    "to_dict records with RawFeedEntry keys": lambda: pandas_parser.Parser(selector=SELECTOR, follower=None, content=content, fields=raw_keys).entries,
+}
+if pandas_parser.pa is not None:
+    benchmarks["to_dict records with pyarrow engine"] = lambda: pandas_parser.Parser(selector='read_csv(file, engine="pyarrow")', follower=None, content=content).entries
+else:
+    print("Skipping the pyarrow engine because pyarrow is not installed.")
+
+for name, benchmark in benchmarks.items():
+    seconds = min(timeit.repeat(benchmark, number=1, repeat=NUM_REPEATS))
+    print(f"{name}: {seconds:.3f}s ({NUM_ROWS / seconds:,.0f} rows/s)")
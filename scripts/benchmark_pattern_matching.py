@@ -0,0 +1,43 @@
+"""Benchmark the matching of the titles of a synthetic feed against many blacklist or whitelist patterns.
+
+CLI example: python -m scripts.benchmark_pattern_matching
+"""
+
+# pylint: disable=invalid-name
+
+import random
+import re
+import timeit
+from typing import Callable, Dict, List, Optional, Pattern
+
+from ircrssfeedbot.util.re import MultiPattern
+
+# Customize:
+NUM_PATTERNS = 500
+NUM_ENTRIES = 1_000
+NUM_REPEATS = 3
+
+random.seed(0)
+words = [f"word{i}" for i in range(5_000)]
+patterns = [rf"(?i)\b{w}\b" if (i % 3) else rf"{w}s?:" for i, w in enumerate(random.sample(words, NUM_PATTERNS))]
+titles = [" ".join(random.choices(words, k=12)) for _ in range(NUM_ENTRIES)]
+compiled_patterns = [re.compile(p) for p in patterns]
+multi_pattern = MultiPattern(patterns)
+
+
+def search_individually(title: str) -> Optional[Pattern]:
+    """Return the first matching pattern using the previous approach."""
+    for pattern in compiled_patterns:
+        if pattern.search(title):
+            return pattern
+    return None
+
+
+results: List[List[Optional[Pattern]]] = []
+searches: Dict[str, Callable[[str], Optional[Pattern]]] = {"individual patterns (previous)": search_individually, "MultiPattern": multi_pattern.search}
+for name, search in searches.items():
+    results.append([search(t) for t in titles])
+    seconds = min(timeit.repeat(lambda search=search: [search(t) for t in titles], number=1, repeat=NUM_REPEATS))  # type: ignore
+    print(f"{name}: {seconds * 1000:.1f}ms for {NUM_ENTRIES:,} titles and {NUM_PATTERNS:,} patterns, matching {sum(map(bool, results[-1])):,} titles")
+if results[0] != results[1]:
+    print("Warning: The matched patterns differ.")
@@ -0,0 +1,99 @@
+"""Benchmark SQL statements which select or insert a set of posted URL hashes, by the number of URL hashes.
+
+The compared approaches are chunked statements having 100 parameters each, a temporary table, and a single JSON array parameter expanded using json_each.
+
+CLI example: python -m scripts.benchmark_posted_hash_queries
+"""
+
+# pylint: disable=invalid-name,protected-access
+
+import json
+import logging
+import random
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Set
+
+from peewee import chunked
+
+from ircrssfeedbot import config
+from ircrssfeedbot.db import _SQL_INSERT_POSTED, Database, Post
+from ircrssfeedbot.util.timeit import Timer
+
+# Customize:
+NUM_ROWS = 1_000_000
+NUM_HASHES = (10, 100, 1_000, 10_000)
+NUM_REPEATS = 5
+POSTED_FRACTION = 0.5
+CHANNEL_HASH, FEED_HASH = 1, 2
+HOUR = int(time.time() // 3600)
+
+logging.getLogger(config.PACKAGE_NAME).setLevel(logging.WARNING)
+config.INSTANCE = {"dir": Path(tempfile.mkdtemp())}
+db = Database()
+rng = random.Random(0)
+posted_hashes = [rng.getrandbits(63) for _ in range(NUM_ROWS)]
+timer = Timer()
+with db._db.atomic():
+    db._db.connection().executemany("INSERT INTO post (channel, feed, url, hour) VALUES (?, ?, ?, ?)", ((CHANNEL_HASH, FEED_HASH, h, HOUR) for h in posted_hashes))
+db._db.execute_sql("ANALYZE;")
+print(f"Inserted {NUM_ROWS:,} rows in {timer}.")
+
+
+def select_using_chunks(url_hashes: List[int]) -> Set[int]:
+    """Return the posted URL hashes using one query per chunk of 100 URL hashes."""
+    conditions = (Post.channel == CHANNEL_HASH) & (Post.feed == FEED_HASH)
+    selected: Set[int] = set()
+    for hashes_batch in chunked(url_hashes, 100):
+        selected |= {post[0] for post in Post.select(Post.url).where(conditions & Post.url.in_(hashes_batch)).tuples().iterator()}
+    return selected
+
+
+def select_using_temp_table(url_hashes: List[int]) -> Set[int]:
+    """Return the posted URL hashes using a temporary table which is joined."""
+    db._db.execute_sql("CREATE TEMP TABLE IF NOT EXISTS hashes (value INTEGER PRIMARY KEY)")
+    db._db.execute_sql("DELETE FROM temp.hashes")
+    db._db.connection().executemany("INSERT OR IGNORE INTO temp.hashes (value) VALUES (?)", ((h,) for h in url_hashes))
+    cursor = db._db.execute_sql(
+        "SELECT post.url FROM temp.hashes CROSS JOIN post ON (post.channel = ?) AND (post.feed = ?) AND (post.url = hashes.value)", (CHANNEL_HASH, FEED_HASH)
+    )
+    return {row[0] for row in cursor}
+
+
+def select_using_json_each(url_hashes: List[int]) -> Set[int]:
+    """Return the posted URL hashes using a single query having a JSON array parameter."""
+    return db._select_posted_hashes(CHANNEL_HASH, url_hashes, FEED_HASH)
+
+
+def insert_using_chunks(url_hashes: List[int]) -> None:
+    """Insert the URL hashes using one statement per chunk of 100 rows."""
+    for batch in chunked(({"channel": CHANNEL_HASH + 1, "feed": FEED_HASH, "url": h, "hour": HOUR} for h in url_hashes), 100):
+        Post.insert_many(batch).execute()  # pylint: disable=no-value-for-parameter
+
+
+def insert_using_json_each(url_hashes: List[int]) -> None:
+    """Insert the URL hashes using a single statement having a JSON array parameter."""
+    db._db.execute_sql(_SQL_INSERT_POSTED, (CHANNEL_HASH + 1, FEED_HASH, HOUR, json.dumps(url_hashes)))
+
+
+def time_rolled_back(func: Callable[[List[int]], None], url_hashes: List[int]) -> float:
+    """Return the seconds used by the given function in a transaction which is then rolled back."""
+    with db._db.atomic() as transaction:
+        seconds = timeit.timeit(lambda: func(url_hashes), number=1)
+        transaction.rollback()
+    return seconds
+
+
+for num_hashes in NUM_HASHES:
+    num_posted = int(num_hashes * POSTED_FRACTION)
+    queried_hashes = rng.sample(posted_hashes, num_posted) + [rng.getrandbits(63) for _ in range(num_hashes - num_posted)]
+    selectors: Dict[str, Callable[[List[int]], Set[int]]] = {"chunks": select_using_chunks, "temp table": select_using_temp_table, "json_each": select_using_json_each}
+    assert len({frozenset(select(queried_hashes)) for select in selectors.values()}) == 1
+    for name, select in selectors.items():
+        min_seconds = min(timeit.repeat(lambda s=select, h=queried_hashes: s(h), number=1, repeat=NUM_REPEATS))  # type: ignore
+        print(f"Selected {num_posted:,} posted out of {num_hashes:,} URL hashes using {name} in {min_seconds * 1000:.2f}ms.")
+    for name, insert in {"chunks": insert_using_chunks, "json_each": insert_using_json_each}.items():
+        min_seconds = min(time_rolled_back(insert, queried_hashes) for _ in range(NUM_REPEATS))
+        print(f"Inserted {num_hashes:,} URL hashes using {name} in {min_seconds * 1000:.2f}ms.")
@@ -0,0 +1,82 @@
+"""Benchmark the selection of unposted URLs using in-memory posted URL hashes versus using SQL queries.
+
+CLI example: python -m scripts.benchmark_posted_index
+"""
+
+# pylint: disable=invalid-name,protected-access
+
+import logging
+import random
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import List, Set
+
+from peewee import chunked
+
+from ircrssfeedbot import config
+from ircrssfeedbot.db import Database, Post
+from ircrssfeedbot.util.hashlib import Int8Hash
+from ircrssfeedbot.util.humanize import humanize_bytes
+from ircrssfeedbot.util.timeit import Timer
+
+# Customize:
+NUM_ROWS = 10_000_000
+NUM_FEEDS = 1_000
+NUM_URLS_PER_SELECTION = 100
+NUM_SELECTIONS = 100
+POSTED_FRACTION = 0.9
+CHANNEL = "#channel"
+
+logging.getLogger(config.PACKAGE_NAME).setLevel(logging.WARNING)
+config.INSTANCE = {"dir": Path(tempfile.mkdtemp())}
+db = Database()
+channel_hash = Int8Hash.as_int(CHANNEL)
+feeds = [f"feed{i}" for i in range(NUM_FEEDS)]
+feed_hashes = [Int8Hash.as_int(f) for f in feeds]
+hour = int(time.time() // 3600)
+
+timer = Timer()
+with db._db.atomic():
+    db._db.connection().executemany(
+        "INSERT INTO post (channel, feed, url, hour) VALUES (?, ?, ?, ?)",
+        ((channel_hash, feed_hashes[i % NUM_FEEDS], Int8Hash.as_int(f"https://example.com/{i}"), hour) for i in range(NUM_ROWS)),
+    )
+db._db.execute_sql("ANALYZE;")
+print(f"Inserted {NUM_ROWS:,} rows in {timer}.")
+
+rng = random.Random(0)
+selections = []
+for _ in range(NUM_SELECTIONS):
+    feed_index = rng.randrange(NUM_FEEDS)
+    posted_ids = [feed_index + NUM_FEEDS * rng.randrange(NUM_ROWS // NUM_FEEDS) for _ in range(int(NUM_URLS_PER_SELECTION * POSTED_FRACTION))]
+    unposted_ids = [NUM_ROWS + rng.randrange(NUM_ROWS) for _ in range(NUM_URLS_PER_SELECTION - len(posted_ids))]
+    selections.append((feeds[feed_index], [f"https://example.com/{i}" for i in posted_ids + unposted_ids]))
+
+
+def select_unposted_using_sql(feed: str, urls: List[str]) -> List[str]:
+    """Return the unposted URLs for the channel and feed using chunked SQL queries."""
+    conditions = (Post.channel == channel_hash) & (Post.feed == Int8Hash.as_int(feed))
+    hashes2urls = Int8Hash.as_dict(urls)
+    posted_hashes: Set[int] = set()
+    for hashes_batch in chunked(hashes2urls, 100):
+        posted_hashes |= {post[0] for post in Post.select(Post.url).where(conditions & Post.url.in_(hashes_batch)).tuples().iterator()}
+    return [url for url_hash, url in hashes2urls.items() if url_hash not in posted_hashes]
+
+
+def select_unposted_using_memory(feed: str, urls: List[str]) -> List[str]:
+    """Return the unposted URLs for the channel and feed using the in-memory posted URL hashes."""
+    return db.select_unposted_for_channel_feed(CHANNEL, feed, urls)
+
+
+timer = Timer()
+db._posted_hashes(channel_hash)
+for feed_hash in feed_hashes:
+    db._posted_hashes(channel_hash, feed_hash)
+print(f"Loaded the posted URL hashes of {NUM_ROWS:,} rows for the channel and for each of its {NUM_FEEDS:,} feeds in {timer}.")
+print(f"The loaded posted URL hashes use {humanize_bytes(db.posted_hashes_nbytes)} of memory.")
+assert all(select_unposted_using_sql(*s) == select_unposted_using_memory(*s) for s in selections)
+for name, func in {"SQL": select_unposted_using_sql, "in-memory hashes": select_unposted_using_memory}.items():
+    seconds = min(timeit.repeat(lambda f=func: [f(*s) for s in selections], number=1, repeat=3)) / NUM_SELECTIONS  # type: ignore
+    print(f"Selected unposted URLs out of {NUM_URLS_PER_SELECTION} URLs using {name} in {seconds * 1000:.2f}ms per selection.")
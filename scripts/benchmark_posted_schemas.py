@@ -0,0 +1,118 @@
+"""Benchmark the file size and the query latencies of the v3 and v4 schemas of the post table using the same synthetic rows.
+
+The v3 table has a rowid, a primary key index, and a (channel, url) index. The v4 table is without rowid, being clustered on its primary key, and it has the same
+(channel, url) index.
+
+CLI example: python -m scripts.benchmark_posted_schemas
+"""
+
+# pylint: disable=invalid-name,protected-access
+
+import json
+import logging
+import random
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import peewee
+
+from ircrssfeedbot import config
+from ircrssfeedbot.db import _SQL_INSERT_POSTED, _SQL_SELECT_POSTED_FOR_CHANNEL, _SQL_SELECT_POSTED_FOR_CHANNEL_FEED, Post
+from ircrssfeedbot.util.humanize import humanize_bytes
+from ircrssfeedbot.util.timeit import Timer
+
+# Customize:
+NUM_ROWS = 10_000_000
+NUM_CHANNELS = 10
+NUM_FEEDS_PER_CHANNEL = 100
+NUM_HASHES_PER_QUERY = 100
+NUM_QUERIES = 100
+POSTED_FRACTION = 0.5
+RECENTLY_POSTED_LIMIT = config.INCREMENTAL_POSTED_HASHES_MAX
+MAX_AGE_HOURS = 5 * 365 * 24
+
+SQL_CREATE_V3 = (
+    'CREATE TABLE "post" ("channel" INTEGER NOT NULL, "feed" INTEGER NOT NULL, "url" INTEGER NOT NULL, "hour" INTEGER NOT NULL, PRIMARY KEY ("channel", "feed", "url"));',
+    'CREATE INDEX "post_channel_url" ON "post" ("channel", "url");',
+)
+SQL_ORDER_RECENTLY_POSTED = {"v3": "rowid DESC", "v4": "hour DESC"}
+
+logging.getLogger(config.PACKAGE_NAME).setLevel(logging.WARNING)
+db_dir = Path(tempfile.mkdtemp())
+rng = random.Random(0)
+hour = int(time.time() // 3600)
+rows_per_feed = NUM_ROWS // (NUM_CHANNELS * NUM_FEEDS_PER_CHANNEL)
+channel_hashes = [rng.getrandbits(64) - 2**63 for _ in range(NUM_CHANNELS)]
+feed_hashes = [rng.getrandbits(64) - 2**63 for _ in range(NUM_FEEDS_PER_CHANNEL)]
+dbs: Dict[str, peewee.SqliteDatabase] = {version: peewee.SqliteDatabase(db_dir / f"posts.{version}.db", pragmas=config.DB_PRAGMAS) for version in ("v3", "v4")}
+
+# Create databases
+timer = Timer()
+with dbs["v4"].bind_ctx([Post]):
+    dbs["v4"].create_tables([Post])
+with dbs["v4"].atomic():
+    for channel_hash in sorted(channel_hashes):
+        for feed_hash in sorted(feed_hashes):
+            url_hashes = sorted(rng.getrandbits(64) - 2**63 for _ in range(rows_per_feed))
+            dbs["v4"].connection().executemany(
+                "INSERT INTO post (channel, feed, url, hour) VALUES (?, ?, ?, ?)", ((channel_hash, feed_hash, h, hour - rng.randrange(MAX_AGE_HOURS)) for h in url_hashes)
+            )
+for sql in SQL_CREATE_V3:
+    dbs["v3"].execute_sql(sql)
+dbs["v3"].execute_sql("ATTACH DATABASE ? AS v4;", (str(db_dir / "posts.v4.db"),))
+with dbs["v3"].atomic():
+    dbs["v3"].execute_sql("INSERT INTO main.post (channel, feed, url, hour) SELECT channel, feed, url, hour FROM v4.post ORDER BY channel, feed, url;")
+dbs["v3"].execute_sql("DETACH DATABASE v4;")
+for schema_db in dbs.values():
+    schema_db.execute_sql("VACUUM;")
+    schema_db.execute_sql("ANALYZE;")
+    schema_db.execute_sql("PRAGMA wal_checkpoint(TRUNCATE);")  # The file size is otherwise not yet updated.
+print(f"Created v3 and v4 databases having {NUM_ROWS:,} rows each in {timer}.")
+for schema_version in dbs:
+    print(f"The {schema_version} database has size {humanize_bytes((db_dir / f'posts.{schema_version}.db').stat().st_size)}.")
+
+# Prepare queries
+queries = []
+for _ in range(NUM_QUERIES):
+    channel_hash, feed_hash = rng.choice(channel_hashes), rng.choice(feed_hashes)
+    cursor = dbs["v4"].execute_sql("SELECT url FROM post WHERE (channel = ?) AND (feed = ?);", (channel_hash, feed_hash))
+    posted_hashes = rng.sample([row[0] for row in cursor], int(NUM_HASHES_PER_QUERY * POSTED_FRACTION))
+    url_hashes = posted_hashes + [rng.getrandbits(64) - 2**63 for _ in range(NUM_HASHES_PER_QUERY - len(posted_hashes))]
+    queries.append((channel_hash, feed_hash, json.dumps(url_hashes)))
+
+
+def benchmarks(version: str) -> Dict[str, Callable[[], List]]:
+    """Return the functions to benchmark for the given schema version."""
+    db = dbs[version]
+    return {
+        "select posted URL hashes for a channel and feed": lambda: [list(db.execute_sql(_SQL_SELECT_POSTED_FOR_CHANNEL_FEED, (q[2], q[0], q[1]))) for q in queries],
+        "select posted URL hashes for a channel": lambda: [list(db.execute_sql(_SQL_SELECT_POSTED_FOR_CHANNEL, (q[2], q[0]))) for q in queries],
+        "load the posted URL hashes of a channel and feed": lambda: [
+            list(db.execute_sql("SELECT url FROM post WHERE (channel = ?) AND (feed = ?) ORDER BY url;", (q[0], q[1]))) for q in queries
+        ],
+        "select recently posted URL hashes": lambda: [
+            list(
+                db.execute_sql(
+                    f"SELECT url FROM post WHERE (channel = ?) AND (feed = ?) ORDER BY {SQL_ORDER_RECENTLY_POSTED[version]} LIMIT ?;", (q[0], q[1], RECENTLY_POSTED_LIMIT)
+                )
+            )
+            for q in queries
+        ],
+        "check whether a feed is new": lambda: [list(db.execute_sql("SELECT 1 FROM post WHERE (channel = ?) AND (feed = ?) LIMIT 1;", (q[0], q[1]))) for q in queries],
+    }
+
+
+for name in benchmarks("v4"):
+    for schema_version in dbs:
+        seconds = min(timeit.repeat(benchmarks(schema_version)[name], number=1, repeat=5)) / NUM_QUERIES
+        print(f"Using {schema_version}, {name} in {seconds * 1000:.3f}ms per query.")
+for schema_version, schema_db in dbs.items():
+    seconds_list = []
+    for query in queries:
+        with schema_db.atomic() as transaction:
+            seconds_list.append(timeit.timeit(lambda d=schema_db, q=query: d.execute_sql(_SQL_INSERT_POSTED, (q[0], q[1] + 1, hour, q[2])), number=1))  # type: ignore
+            transaction.rollback()
+    print(f"Using {schema_version}, insert {NUM_HASHES_PER_QUERY} URL hashes in {min(seconds_list) * 1000:.3f}ms per query.")
@@ -41,7 +41,9 @@ config.INSTANCE["feeds"][CHANNEL][FEED]["style"] = None
 # Note: url_shortener cannot be used in this script because URL shortening is done at a later stage.
 
 url_reader = URLReader(max_cache_age=3600)
-feed = FeedReader(channel=CHANNEL, name=FEED, irc=None, db=None, url_reader=url_reader, url_shortener=None, publishers=None).read()  # type: ignore
+feed_reader = FeedReader(channel=CHANNEL, name=FEED, irc=None, db=None, url_reader=url_reader, url_shortener=None, publishers=None)  # type: ignore
+feed_reader.entry_fields = None  # Prevents unused entry fields, e.g. categories, from being pruned.
+feed = feed_reader.read()
 for index, entry in enumerate(feed.entries):
     post = f"\n#{index + 1:,}: {entry.message()}"
     if entry.categories: